@@ -19,8 +19,24 @@ import re
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# IdentityResolver is shared with (and lives in) the measure-ai-impact tools
+IDENTITY_RESOLVER_DIR = Path(__file__).resolve().parent.parent.parent / 'measure-ai-impact' / 'tools'
+
+
+def load_identity_resolver():
+    """Import IdentityResolver, only needed for --resolve-identities/--aliases."""
+    if str(IDENTITY_RESOLVER_DIR) not in sys.path:
+        sys.path.append(str(IDENTITY_RESOLVER_DIR))
+    try:
+        from identity_resolver import IdentityResolver
+    except ImportError:
+        raise ValueError(f"Identity resolution needs identity_resolver.py from the measure-ai-impact skill "
+                         f"(looked in {IDENTITY_RESOLVER_DIR})")
+    return IdentityResolver
+
 class ContributorAnalyzer:
-    def __init__(self, repo_path, analysis_period_months=12, output_file=None):
+    def __init__(self, repo_path, analysis_period_months=12, output_file=None,
+                 resolve_identities=False, alias_file=None):
         self.repo_path = Path(repo_path).resolve()
         self.analysis_period_months = analysis_period_months
         self.output_file = output_file
@@ -33,6 +49,12 @@ class ContributorAnalyzer:
         git_dir = self.repo_path / '.git'
         if not git_dir.exists():
             raise ValueError(f"Not a git repository: {repo_path}")
+        
+        # Canonical identities from .mailmap and an alias file; raw author names otherwise
+        self.identity_resolver = (load_identity_resolver()(self.repo_path, alias_file)
+                                  if resolve_identities or alias_file else None)
+        self.display_names = {}
+        self.commit_dates = None
     
     def run_git_command(self, cmd):
         """Execute git command and return output"""
@@ -56,6 +78,9 @@ class ContributorAnalyzer:
         """Get basic contributor statistics"""
         logger.info("Analyzing contributor statistics...")
         
+        if self.identity_resolver:
+            return self.get_resolved_contributor_stats()
+        
         # Get all commits since analysis period
         total_commits_cmd = ['git', 'log', '--oneline', f'--since={self.since_date}']
         total_commits = len(self.run_git_command(total_commits_cmd).split('\n')) if self.run_git_command(total_commits_cmd) else 0
@@ -81,6 +106,45 @@ class ContributorAnalyzer:
         
         return contributor_commits, total_commits, contributor_emails
     
+    def get_resolved_contributor_stats(self):
+        """Contributor statistics keyed by canonical identity, from a single git log pass.
+        
+        Commit dates are kept per contributor for analyze_commit_patterns, which
+        cannot use `--author` once several raw identities map to one person.
+        """
+        log_cmd = ['git', 'log', '--pretty=format:%an%x00%ae%x00%ad', '--date=short', f'--since={self.since_date}']
+        log_output = self.run_git_command(log_cmd)
+        
+        if not log_output:
+            return {}, 0, {}
+        
+        contributor_commits = Counter()
+        contributor_emails = {}
+        self.commit_dates = defaultdict(list)
+        for line in log_output.split('\n'):
+            parts = line.split('\x00')
+            if len(parts) != 3:
+                continue
+            name, email, date = parts
+            contributor, canonical_email = self.resolve_contributor(name, email)
+            contributor_commits[contributor] += 1
+            contributor_emails[contributor] = canonical_email
+            self.commit_dates[contributor].append(date)
+        
+        return contributor_commits, sum(contributor_commits.values()), contributor_emails
+    
+    def resolve_contributor(self, name, email):
+        """Display name and email of the canonical identity behind a raw author."""
+        identity = self.identity_resolver.resolve(name, email)
+        display_name = self.display_names.get(identity.id)
+        if display_name is None:
+            display_name = identity.name
+            # Two different people sharing a name stay apart
+            if display_name in self.display_names.values():
+                display_name = f"{identity.name} <{identity.email}>"
+            self.display_names[identity.id] = display_name
+        return display_name, identity.email
+    
     def identify_bots_and_automation(self, contributor_commits, contributor_emails):
         """Identify automated contributors (bots, CI/CD)"""
         bot_patterns = [
@@ -156,7 +220,11 @@ class ContributorAnalyzer:
                     for line in blame_output.split('\n'):
                         if line.startswith('author '):
                             author = line[7:]  # Remove 'author ' prefix
-                            authors.append(author)
+                            if not self.identity_resolver:
+                                authors.append(author)
+                        elif line.startswith('author-mail ') and self.identity_resolver:
+                            # Follows the 'author' line of the same blame entry
+                            authors.append(self.resolve_contributor(author, line[12:].strip('<>'))[0])
                     
                     if authors:
                         author_counts = Counter(authors)
@@ -181,11 +249,14 @@ class ContributorAnalyzer:
         
         commit_patterns = {}
         for contributor, _ in top_contributors:
-            dates_cmd = ['git', 'log', '--author=' + contributor, '--pretty=format:%ad', '--date=short', f'--since={self.since_date}']
-            dates_output = self.run_git_command(dates_cmd)
+            if self.commit_dates is not None:
+                dates = self.commit_dates.get(contributor)
+            else:
+                dates_cmd = ['git', 'log', '--author=' + contributor, '--pretty=format:%ad', '--date=short', f'--since={self.since_date}']
+                dates_output = self.run_git_command(dates_cmd)
+                dates = dates_output.split('\n') if dates_output else None
             
-            if dates_output:
-                dates = dates_output.split('\n')
+            if dates:
                 commit_patterns[contributor] = {
                     'total_commits': len(dates),
                     'first_commit': min(dates) if dates else None,
@@ -483,6 +554,10 @@ def main():
     parser.add_argument('-o', '--output', help='Output file path (default: stdout)')
     parser.add_argument('-v', '--verbose', action='store_true', 
                        help='Enable verbose logging')
+    parser.add_argument('--resolve-identities', action='store_true',
+                       help='Merge author aliases using .mailmap (and --aliases)')
+    parser.add_argument('--aliases', metavar='FILE',
+                       help='JSON alias file mapping emails/names to canonical identities (implies --resolve-identities)')
     
     args = parser.parse_args()
     
@@ -490,7 +565,8 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     try:
-        analyzer = ContributorAnalyzer(args.repo_path, args.months, args.output)
+        analyzer = ContributorAnalyzer(args.repo_path, args.months, args.output,
+                                       args.resolve_identities, args.aliases)
         analyzer.generate_report()
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
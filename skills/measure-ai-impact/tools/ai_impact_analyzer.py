@@ -16,6 +16,14 @@ AI Detection Patterns:
 - Halstead Difficulty (D) drop: D decreases >30%
 - Effort reduction: E decreases >50%
 - Volume optimization: V decreases while MI increases
+
+Dependencies:
+Imports git_productivity_analyzer (and, through it, identity_resolver) from
+this directory for the blob-keyed quality cache (QualityCache,
+default_quality_cache_path), batched blob reads (GitBlobReader), radon
+metrics (RADON_AVAILABLE, radon_file_metrics, analyze_code_quality),
+LANGUAGE_EXTENSIONS and EMPTY_TREE_OID, so these scripts are deployed
+together.
 """
 
 import json
@@ -23,20 +31,257 @@ import subprocess
 import argparse
 import sys
 import math
+import hashlib
+import mmap
+import os
+import re
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from git_productivity_analyzer import (EMPTY_TREE_OID, LANGUAGE_EXTENSIONS, RADON_AVAILABLE, GitBlobReader,
+                                       QualityCache, analyze_code_quality, default_quality_cache_path,
+                                       radon_file_metrics)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Source code file extensions tracked in snapshots
+CODE_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cs', '.cpp', '.c', '.h', '.rb', '.go', '.rs')
+
+# Simple pattern matching for common function/class definitions.
+# `kw(?<!\wkw)` is `\bkw` written with the literal first, so the regex engine
+# can skip ahead to candidate keywords instead of trying every word boundary.
+FUNCTION_PATTERNS = [
+    re.compile(r'def(?<!\wdef)\s+\w+\s*\('),  # Python
+    re.compile(r'function(?<!\wfunction)\s+\w+\s*\('),  # JavaScript
+    re.compile(r'\b\w+\s+\w+\s*\([^)]*\)\s*{'),  # Java/C#/C++
+]
+CLASS_PATTERNS = [
+    re.compile(r'class(?<!\wclass)\s+\w+'),  # Python/Java/C#
+]
+COMMENT_PREFIXES = ('#', '//', '/*', '*')
+
+# Files at least this large are mapped instead of read into a buffer
+MMAP_THRESHOLD = 1024 * 1024
+
+# Files per process-pool task, and files read ahead per reader thread, with --jobs
+METRICS_CHUNK_SIZE = 64
+READ_AHEAD_PER_THREAD = 4
+
+# Log snapshot progress every N files
+PROGRESS_INTERVAL = 50
+
+# Quality cache kind and version of per-file Halstead metrics; Python results
+# differ with and without radon, so they are cached under separate kinds
+HALSTEAD_CACHE_KIND = 'aia-halstead' if RADON_AVAILABLE else 'aia-halstead-tokens'
+HALSTEAD_ENGINE_VERSION = 1
+
+# Token-based Halstead counting for languages radon does not cover. Reserved
+# words count as operators, identifiers and literals as operands; closing
+# brackets are counted with their opening bracket.
+HALSTEAD_KEYWORDS = frozenset('''
+    if else elif for foreach while do switch case default break continue return goto
+    try catch except finally throw throws raise new delete typeof instanceof sizeof
+    in of is not and or with yield await async lambda def function func fn
+    class struct interface enum trait impl import package using namespace module
+    extends implements public private protected internal static final const var let val
+    defer select chan range match loop unless until begin end then elsif rescue ensure
+'''.split())
+HALSTEAD_OPERAND = (r'''(?P<operand>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`'''
+                    r'|(?:\d|\.\d)[\w.]*|[A-Za-z_$][\w$]*)')
+HALSTEAD_OPERATOR = (r'(?P<operator>>>>=|<<=|>>=|>>>|===|!==|\.\.\.|\*\*=?|->|=>|::|\+\+|--|&&|\|\||<<|>>'
+                     r'|[-+*/%=<>!&|^]=|[-+*/%=<>!&|^~?:;,.(\[{@#])')
+HALSTEAD_TOKEN_RES = {
+    'slash': re.compile(r'(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))|' + HALSTEAD_OPERAND + '|' + HALSTEAD_OPERATOR,
+                        re.DOTALL),
+    'hash': re.compile(r'(?P<comment>\#[^\n]*)|' + HALSTEAD_OPERAND + '|' + HALSTEAD_OPERATOR)
+}
+HASH_COMMENT_LANGUAGES = {'python', 'rb'}
+
+# `--at` values of this form are dates; anything else is a git revision
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def decode_source(data) -> str:
+    """Decode file bytes the way text-mode open() would (UTF-8, universal newlines)."""
+    text = str(data, 'utf-8', 'ignore')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def git_blob_id(data) -> str:
+    """Id git gives a blob with this content (as `git hash-object`, without filters)."""
+    digest = hashlib.sha1(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def read_source(file_path: Path, blob_id: bool = False) -> Tuple[str, int, Optional[str]]:
+    """Read a file once, returning (decoded text, size in bytes, blob id if requested)."""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return decode_source(view), size, git_blob_id(view) if blob_id else None
+        data = f.read()
+        return decode_source(data), size, git_blob_id(data) if blob_id else None
+
+
+def file_language(file_path: str) -> str:
+    """Language name used by analyze_code_quality, or the bare extension for others."""
+    suffix = Path(file_path).suffix.lower()
+    for language, extensions in LANGUAGE_EXTENSIONS.items():
+        if suffix in extensions:
+            return language
+    return suffix.lstrip('.')
+
+
+def count_source_loc(text: str) -> int:
+    """Lines of code (non-empty, non-comment) in decoded source."""
+    count = 0
+    for line in text.split('\n'):
+        line = line.strip()
+        if line and not line.startswith(COMMENT_PREFIXES):
+            count += 1
+    return count
+
+
+def count_matches(patterns: List, text: str) -> int:
+    """Total non-overlapping matches of each pattern in text."""
+    return sum(len(pattern.findall(text)) for pattern in patterns)
+
+
+def extract_source_metrics(text: str) -> Dict[str, int]:
+    """LOC, function and class counts of already decoded source."""
+    return {
+        "loc": count_source_loc(text),
+        "function_count": count_matches(FUNCTION_PATTERNS, text),
+        "class_count": count_matches(CLASS_PATTERNS, text)
+    }
+
+
+def halstead_counts(code: str, language: str) -> Tuple[int, int, int, int]:
+    """Distinct operators, distinct operands, total operators, total operands."""
+    token_re = HALSTEAD_TOKEN_RES['hash' if language in HASH_COMMENT_LANGUAGES else 'slash']
+    operators = Counter()
+    operands = Counter()
+    for match in token_re.finditer(code):
+        kind = match.lastgroup
+        if kind == 'comment':
+            continue
+        token = match.group()
+        if kind == 'operand' and token not in HALSTEAD_KEYWORDS:
+            operands[token] += 1
+        else:
+            operators[token] += 1
+    return len(operators), len(operands), sum(operators.values()), sum(operands.values())
+
+
+def maintainability_index(volume: float, complexity: float, sloc: int, comment_percent: float) -> float:
+    """Maintainability Index on a 0-100 scale (the formula of radon.metrics.mi_compute)."""
+    if volume <= 0 or sloc <= 0:
+        return 100.0
+    nn_mi = (171 - 5.2 * math.log(volume) - 0.23 * complexity - 16.2 * math.log(sloc)
+             + 50 * math.sin(math.sqrt(2.46 * math.radians(comment_percent))))
+    return min(max(0.0, nn_mi * 100 / 171.0), 100.0)
+
+
+def token_halstead_metrics(code: str, language: str) -> Optional[Dict]:
+    """Halstead volume/difficulty/effort and MI from token counts, for any language."""
+    quality = analyze_code_quality(code, language)
+    if quality is None:
+        return None
+    n1, n2, total1, total2 = halstead_counts(code, language)
+    vocabulary = n1 + n2
+    length = total1 + total2
+    volume = length * math.log2(vocabulary) if vocabulary > 0 else 0
+    difficulty = (n1 * total2) / (2 * n2) if n2 > 0 else 0
+    return {
+        'volume': volume,
+        'difficulty': difficulty,
+        'effort': difficulty * volume,
+        'maintainability_index': maintainability_index(volume, quality['complexity'], quality['loc'],
+                                                       quality['comment_density'])
+    }
+
+
+def halstead_file_metrics(code: str, language: str) -> Optional[Dict]:
+    """The per-file `halstead` block read by detect_ai_signature.
+    
+    Python files use radon (see git_productivity_analyzer.radon_file_metrics);
+    other languages, and Python that radon cannot parse, use the token
+    counter. None for blank files.
+    """
+    if not code.strip():
+        return None
+    
+    metrics = None
+    engine = 'radon'
+    if language == 'python':
+        radon = radon_file_metrics(code)
+        if radon:
+            metrics = {
+                'volume': radon['halstead_volume'],
+                'difficulty': radon['halstead_difficulty'],
+                'effort': radon['halstead_effort'],
+                'maintainability_index': radon['maintainability_index']
+            }
+    if metrics is None:
+        engine = 'tokens'
+        metrics = token_halstead_metrics(code, language)
+        if metrics is None:
+            return None
+    
+    halstead = {key: round(value, 2) for key, value in metrics.items()}
+    halstead['engine'] = engine
+    return halstead
+
+
+def _extract_metrics_chunk(tasks: List[Tuple[Optional[str], str, bool]]
+                           ) -> List[Tuple[Optional[Dict[str, int]], Optional[Dict]]]:
+    """Process-pool worker: (source metrics, Halstead block) for a chunk of
+    (decoded text or None if unreadable, language, whether to compute Halstead) tasks."""
+    results = []
+    for text, language, with_halstead in tasks:
+        if text is None:
+            results.append((None, None))
+            continue
+        results.append((extract_source_metrics(text), halstead_file_metrics(text, language) if with_halstead else None))
+    return results
+
+
+def _historical_snapshot(repo_path: str, quality_cache: Optional[str], snapshot_name: str, at: str,
+                         months_lookback: int, include_halstead: bool) -> str:
+    """Process-pool worker: one historical snapshot, with its own git processes."""
+    analyzer = AIImpactAnalyzer(repo_path, quality_cache=quality_cache)
+    return analyzer.create_snapshot(snapshot_name, months_lookback, include_halstead, at=at)
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 
 class AIImpactAnalyzer:
     """Analyzes AI impact on code metrics with snapshot and comparison capabilities."""
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, jobs: int = 1, quality_cache: Optional[str] = None):
         self.repo_path = Path(repo_path).resolve()
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.quality_cache_path = quality_cache
+        self.quality_cache = QualityCache(Path(quality_cache)) if quality_cache else None
         self.snapshots_dir = self.repo_path / "olaf-data" / "metrics-snapshots"
         self.snapshots_dir.mkdir(parents=True, exist_ok=True)
     
@@ -71,82 +316,104 @@ class AIImpactAnalyzer:
         latest = max(snapshots, key=lambda p: p.stat().st_mtime)
         return str(latest)
     
-    def get_modified_files_since(self, months: int = 6) -> List[str]:
-        """Get all code files modified in the last N months."""
-        since_date = (datetime.now() - timedelta(days=30 * months)).strftime('%Y-%m-%d')
+    def get_modified_files_since(self, months: int = 6, until: Optional[Tuple[str, datetime]] = None) -> List[str]:
+        """Get all code files modified in the last N months.
+        
+        One tree diff between the boundary commit and the tip replaces
+        diffing every commit in the window: git reports each changed, added
+        or deleted path once. The boundary is the last commit before the
+        window on the tip's first-parent line, so an old commit from a
+        merged branch cannot stand in for it. Without a boundary (history
+        younger than the window) the tip is diffed against the empty tree. Files created and deleted within the window, or
+        whose changes were all reverted, are not listed.
+        
+        With `until` (a commit and reference date, see `resolve_point`), the
+        N months end at the reference date and the commit is the tip.
+        """
+        end = until[1] if until else datetime.now()
+        since_date = (end - timedelta(days=30 * months)).strftime('%Y-%m-%d')
+        tip = until[0] if until else 'HEAD'
         
         try:
-            cmd = ['git', 'log', f'--since={since_date}', '--name-only', '--pretty=format:']
-            result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True, check=True)
-            
-            files = set()
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line and self._is_code_file(line):
-                    files.add(line)
+            boundary = subprocess.run(['git', 'rev-list', '-1', '--first-parent', f'--before={since_date}', tip],
+                                      cwd=self.repo_path, capture_output=True, text=True, check=True).stdout.strip()
+            changed = subprocess.run(['git', 'diff-tree', '-r', '--no-renames', '--name-only', '-z',
+                                      boundary or EMPTY_TREE_OID, tip],
+                                     cwd=self.repo_path, capture_output=True, check=True).stdout
             
-            return sorted(files)
+            paths = (raw_path.decode('utf-8', errors='surrogateescape') for raw_path in changed.split(b'\0'))
+            return sorted(path for path in paths if path and self._is_code_file(path))
         except Exception as e:
             logger.error(f"Failed to get modified files: {e}")
             return []
     
+    def resolve_point(self, at: str) -> Tuple[str, datetime]:
+        """Resolve a `--at` value to (commit, reference date).
+        
+        A date (YYYY-MM-DD, optionally with a time) selects the last commit
+        on HEAD's first-parent line at or before it, and is itself the reference date; a bare
+        date includes the whole day. Anything else is a git revision, and
+        its committer date is the reference date.
+        """
+        if DATE_PATTERN.fullmatch(at):
+            at = f"{at} 23:59:59"
+        if DATE_PATTERN.match(at):
+            reference = datetime.fromisoformat(at)
+            result = subprocess.run(['git', 'rev-list', '-1', '--first-parent', f'--before={at}', 'HEAD'],
+                                    cwd=self.repo_path, capture_output=True, text=True)
+            commit = result.stdout.strip()
+            if result.returncode != 0 or not commit:
+                raise ValueError(f"No commit at or before {at}")
+            return commit, reference
+        
+        result = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', f'{at}^{{commit}}'], cwd=self.repo_path,
+                                capture_output=True, text=True)
+        commit = result.stdout.strip()
+        if result.returncode != 0 or not commit:
+            raise ValueError(f"Unknown revision: {at}")
+        timestamp = subprocess.run(['git', 'show', '-s', '--format=%ct', commit], cwd=self.repo_path,
+                                   capture_output=True, text=True, check=True).stdout.strip()
+        return commit, datetime.fromtimestamp(int(timestamp))
+    
+    def _tree_blobs(self, commit: str) -> Dict[str, str]:
+        """Blob id of every file in a commit's tree, by path."""
+        output = subprocess.run(['git', 'ls-tree', '-r', '-z', '--full-tree', commit], cwd=self.repo_path,
+                                capture_output=True, check=True).stdout
+        blobs = {}
+        for entry in output.split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            _, object_type, oid = info.split()
+            if object_type == b'blob':
+                blobs[path.decode('utf-8', errors='surrogateescape')] = oid.decode('ascii')
+        return blobs
+    
     def _is_code_file(self, file_path: str) -> bool:
         """Check if file is a source code file."""
-        code_extensions = {'.py', '.js', '.ts', '.java', '.cs', '.cpp', '.c', '.h', '.rb', '.go', '.rs'}
-        return Path(file_path).suffix.lower() in code_extensions
+        return Path(file_path).suffix.lower() in CODE_EXTENSIONS
+    
+    def _read_text(self, file_path: Path) -> Optional[str]:
+        """Decoded file contents, or None if the file cannot be read."""
+        try:
+            return read_source(file_path)[0]
+        except (OSError, ValueError):
+            return None
     
     def count_loc(self, file_path: Path) -> int:
         """Count lines of code (non-empty, non-comment)."""
-        if not file_path.exists():
-            return 0
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                return sum(1 for line in lines if line.strip() and not line.strip().startswith(('#', '//', '/*', '*')))
-        except:
-            return 0
+        text = self._read_text(file_path)
+        return count_source_loc(text) if text is not None else 0
     
     def count_functions(self, file_path: Path) -> int:
         """Count functions in a file (simplified detection)."""
-        if not file_path.exists():
-            return 0
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                # Simple pattern matching for common function definitions
-                import re
-                patterns = [
-                    r'\bdef\s+\w+\s*\(',  # Python
-                    r'\bfunction\s+\w+\s*\(',  # JavaScript
-                    r'\b\w+\s+\w+\s*\([^)]*\)\s*{',  # Java/C#/C++
-                ]
-                count = 0
-                for pattern in patterns:
-                    count += len(re.findall(pattern, content))
-                return count
-        except:
-            return 0
+        text = self._read_text(file_path)
+        return count_matches(FUNCTION_PATTERNS, text) if text is not None else 0
     
     def count_classes(self, file_path: Path) -> int:
         """Count classes in a file."""
-        if not file_path.exists():
-            return 0
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                import re
-                patterns = [
-                    r'\bclass\s+\w+',  # Python/Java/C#
-                ]
-                count = 0
-                for pattern in patterns:
-                    count += len(re.findall(pattern, content))
-                return count
-        except:
-            return 0
+        text = self._read_text(file_path)
+        return count_matches(CLASS_PATTERNS, text) if text is not None else 0
     
     def detect_ai_signature(self, baseline_metrics: Dict, current_metrics: Dict) -> Tuple[float, List[str]]:
         """
@@ -243,22 +510,173 @@ class AIImpactAnalyzer:
         
         return final_score, indicators
     
-    def get_file_metrics(self, file_path: str) -> Dict:
-        """Get basic metrics for a single file."""
+    def _read_file(self, file_path: str, blob_id: bool = False) -> Tuple[Dict, Optional[str], Optional[str]]:
+        """Read a file once: its metrics skeleton (existence, size), decoded text and blob id."""
         full_path = self.repo_path / file_path
-        
-        return {
+        metrics = {
             "file_path": file_path,
             "exists": full_path.exists(),
-            "loc": self.count_loc(full_path),
-            "function_count": self.count_functions(full_path),
-            "class_count": self.count_classes(full_path),
-            "file_size_bytes": full_path.stat().st_size if full_path.exists() else 0
+            "loc": 0,
+            "function_count": 0,
+            "class_count": 0,
+            "file_size_bytes": 0
         }
+        if not metrics["exists"]:
+            return metrics, None, None
+        
+        try:
+            text, metrics["file_size_bytes"], oid = read_source(full_path, blob_id)
+        except (OSError, ValueError):
+            metrics["file_size_bytes"] = full_path.stat().st_size
+            return metrics, None, None
+        return metrics, text, oid
+    
+    def get_file_metrics(self, file_path: str) -> Dict:
+        """Get basic metrics for a single file.
+        
+        The file is read once (memory-mapped when large) and LOC, function,
+        class and byte counts all come from that single read.
+        """
+        metrics, text, _ = self._read_file(file_path)
+        if text is not None:
+            metrics.update(extract_source_metrics(text))
+        return metrics
+    
+    def _read_files(self, file_paths: List[str], blob_id: bool = False
+                    ) -> Iterator[Tuple[Dict, Optional[str], Optional[str]]]:
+        """Yield `_read_file` results in order, reading ahead on a thread pool with --jobs."""
+        if self.jobs <= 1:
+            for file_path in file_paths:
+                yield self._read_file(file_path, blob_id)
+            return
+        
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.jobs) as readers:
+            for file_path in file_paths:
+                window.append(readers.submit(self._read_file, file_path, blob_id))
+                if len(window) >= self.jobs * READ_AHEAD_PER_THREAD:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+    
+    def _read_blobs(self, file_paths: List[str], commit: str) -> Iterator[Tuple[Dict, Optional[str], Optional[str]]]:
+        """Yield `_read_file`-style results for files as of a commit.
+        
+        Contents are streamed from the object database through one
+        `git cat-file --batch` process; the working tree is never touched.
+        """
+        tree = self._tree_blobs(commit)
+        with GitBlobReader(self.repo_path) as blobs:
+            for file_path in file_paths:
+                oid = tree.get(file_path)
+                metrics = {
+                    "file_path": file_path,
+                    "exists": oid is not None,
+                    "loc": 0,
+                    "function_count": 0,
+                    "class_count": 0,
+                    "file_size_bytes": 0
+                }
+                data = blobs.read(oid) if oid else None
+                if data is None:
+                    yield metrics, None, None
+                    continue
+                metrics["file_size_bytes"] = len(data)
+                yield metrics, decode_source(data), oid
+    
+    def _evaluate_chunks(self, chunks: Iterable[Tuple[List, List]]) -> Iterator[Tuple[List, List]]:
+        """Yield (chunk, `_extract_metrics_chunk` results) for (chunk, tasks) pairs, in order.
+        
+        With more than one job, tasks are fanned out to a process pool; at
+        most two chunks per process are in flight, and results are yielded
+        in submission order, so output does not depend on --jobs.
+        """
+        if self.jobs <= 1:
+            for chunk, tasks in chunks:
+                yield chunk, _extract_metrics_chunk(tasks)
+            return
+        
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            for chunk, tasks in chunks:
+                pending.append((chunk, executor.submit(_extract_metrics_chunk, tasks)))
+                if len(pending) >= self.jobs * 2:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+    
+    def _iter_file_metrics(self, file_paths: List[str], include_halstead: bool = False,
+                           cache_stats: Optional[Dict[str, int]] = None, commit: Optional[str] = None) -> Iterator[Dict]:
+        """Yield file metrics for each path, in order.
+        
+        Files are read on a thread pool, or as of `commit` from git objects,
+        and their text is evaluated on a process pool (see `_read_files`,
+        `_read_blobs`, `_evaluate_chunks`). With
+        include_halstead each readable file also gets a `halstead` block;
+        with a quality cache, blocks are looked up by blob id first and only
+        new content is evaluated.
+        """
+        use_cache = include_halstead and self.quality_cache is not None
+        
+        def tasks_for(chunk):
+            cached = {}
+            if use_cache:
+                keys = [(oid, file_language(metrics['file_path'])) for metrics, text, oid in chunk if text is not None]
+                cached = self.quality_cache.get_many(HALSTEAD_CACHE_KIND, HALSTEAD_ENGINE_VERSION, keys)
+            tasks = []
+            for metrics, text, oid in chunk:
+                language = file_language(metrics['file_path'])
+                tasks.append((text, language, include_halstead and (oid, language) not in cached))
+            return (chunk, cached), tasks
+        
+        reads = self._read_blobs(file_paths, commit) if commit else self._read_files(file_paths, use_cache)
+        chunks = (tasks_for(chunk) for chunk in _chunked(reads, METRICS_CHUNK_SIZE))
+        for (chunk, cached), results in self._evaluate_chunks(chunks):
+            fresh = []
+            hits = 0
+            for (metrics, text, oid), (extracted, halstead) in zip(chunk, results):
+                if extracted is not None:
+                    metrics.update(extracted)
+                if include_halstead and text is not None:
+                    key = (oid, file_language(metrics['file_path']))
+                    if key in cached:
+                        halstead = cached[key]
+                        hits += 1
+                    elif use_cache:
+                        fresh.append((oid, key[1], halstead))
+                    if halstead is not None:
+                        metrics['halstead'] = halstead
+                yield metrics
+            
+            if use_cache and cache_stats is not None:
+                cache_stats['hits'] += hits
+                cache_stats['misses'] += len(fresh)
+            if fresh:
+                evicted = self.quality_cache.put_many(HALSTEAD_CACHE_KIND, HALSTEAD_ENGINE_VERSION, fresh)
+                if cache_stats is not None:
+                    cache_stats['evicted'] += evicted
+    
+    def collect_file_metrics(self, file_paths: List[str], include_halstead: bool = False,
+                             cache_stats: Optional[Dict[str, int]] = None, commit: Optional[str] = None) -> List[Dict]:
+        """Metrics for every path (as of `commit` if given), in input order, logging progress."""
+        total = len(file_paths)
+        started = time.monotonic()
+        file_metrics = []
+        for i, metrics in enumerate(self._iter_file_metrics(file_paths, include_halstead, cache_stats, commit), 1):
+            file_metrics.append(metrics)
+            
+            if i % PROGRESS_INTERVAL == 0 or i == total:
+                elapsed = time.monotonic() - started
+                rate = f" ({i / elapsed:.0f} files/s)" if elapsed > 0 else ""
+                logger.info(f"Processed {i}/{total} files{rate}...")
+        return file_metrics
     
     def create_snapshot(self, snapshot_name: Optional[str] = None, 
                        months_lookback: int = 6,
-                       include_halstead: bool = False) -> str:
+                       include_halstead: bool = False,
+                       at: Optional[str] = None) -> str:
         """
         Create a metrics snapshot for all modified files.
         
@@ -266,32 +684,30 @@ class AIImpactAnalyzer:
             snapshot_name: Custom name (defaults to date-based: YYYY-QQ)
             months_lookback: How far back to look for modified files
             include_halstead: Include Halstead complexity metrics (slower)
+            at: Measure the code as of this commit or date (see `resolve_point`)
+                instead of the working tree
         
         Returns:
             Path to saved snapshot JSON
         """
+        point = self.resolve_point(at) if at else None
+        
         # Generate snapshot name
         if not snapshot_name:
-            now = datetime.now()
-            quarter = (now.month - 1) // 3 + 1
-            snapshot_name = f"{now.year}-Q{quarter}"
+            snapshot_name = self._quarter_name(point[1] if point else datetime.now())
         
-        logger.info(f"Creating snapshot: {snapshot_name}")
-        if include_halstead:
-            logger.warning("Halstead metrics requested but not yet implemented - snapshots will not include Halstead data")
+        logger.info(f"Creating snapshot: {snapshot_name}" + (f" at {point[0][:8]}" if point else ""))
         
         # Get modified files
-        modified_files = self.get_modified_files_since(months_lookback)
+        modified_files = self.get_modified_files_since(months_lookback, point)
         logger.info(f"Found {len(modified_files)} modified files")
         
         # Collect metrics for each file
-        file_metrics = []
-        for i, file_path in enumerate(modified_files, 1):
-            metrics = self.get_file_metrics(file_path)
-            file_metrics.append(metrics)
-            
-            if i % 50 == 0:
-                logger.info(f"Processed {i}/{len(modified_files)} files...")
+        if self.jobs > 1:
+            logger.info(f"Collecting file metrics with {self.jobs} jobs")
+        cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+        file_metrics = self.collect_file_metrics(modified_files, include_halstead, cache_stats,
+                                                 point[0] if point else None)
         
         # Calculate aggregate stats
         total_loc = sum(m['loc'] for m in file_metrics if m['exists'])
@@ -317,6 +733,16 @@ class AIImpactAnalyzer:
             "file_metrics": file_metrics
         }
         
+        if point:
+            snapshot_data['metadata']['at'] = at
+            snapshot_data['metadata']['commit'] = point[0]
+            snapshot_data['metadata']['reference_date'] = point[1].isoformat()
+        if include_halstead:
+            snapshot_data['metadata']['include_halstead'] = True
+            if self.quality_cache is not None:
+                snapshot_data['metadata']['halstead_cache'] = cache_stats
+            snapshot_data['aggregate_metrics'].update(self._halstead_aggregate(file_metrics))
+        
         # Save snapshot
         snapshot_file = self.snapshots_dir / f"snapshot-{snapshot_name}.json"
         with open(snapshot_file, 'w', encoding='utf-8') as f:
@@ -325,6 +751,87 @@ class AIImpactAnalyzer:
         logger.info(f"Snapshot saved: {snapshot_file}")
         return str(snapshot_file)
     
+    @staticmethod
+    def _quarter_name(when: datetime) -> str:
+        return f"{when.year}-Q{(when.month - 1) // 3 + 1}"
+    
+    def create_historical_snapshots(self, points: List[str], months_lookback: int = 6,
+                                    include_halstead: bool = False) -> List[str]:
+        """Create one snapshot per `--at` point, named after its quarter.
+        
+        Points are resolved up front, so a bad revision or a duplicate
+        quarter fails before any work starts. With more than one job,
+        snapshots are computed concurrently, one process (and one
+        `git cat-file` reader) each; paths are returned in input order.
+        """
+        names = [self._quarter_name(self.resolve_point(at)[1]) for at in points]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Several points fall in the same quarter: {', '.join(duplicates)}")
+        
+        if self.jobs <= 1 or len(points) == 1:
+            return [self.create_snapshot(name, months_lookback, include_halstead, at=at)
+                    for name, at in zip(names, points)]
+        
+        snapshot_files = [None] * len(points)
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(points))) as executor:
+            futures = {
+                executor.submit(_historical_snapshot, str(self.repo_path), self.quality_cache_path, name, at,
+                                months_lookback, include_halstead): index
+                for index, (name, at) in enumerate(zip(names, points))
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                snapshot_files[index] = future.result()
+                logger.info(f"[{done}/{len(points)}] Snapshot {names[index]} done")
+        return snapshot_files
+    
+    def _halstead_aggregate(self, file_metrics: List[Dict]) -> Dict:
+        """Average Halstead/MI values per engine over the files that have a `halstead` block.
+        
+        radon and the token counter measure on different scales, so their
+        values are never averaged together.
+        """
+        blocks_by_engine = {}
+        for m in file_metrics:
+            if m.get('halstead'):
+                blocks_by_engine.setdefault(m['halstead'].get('engine', 'unknown'), []).append(m['halstead'])
+        
+        def average(blocks, key):
+            return round(sum(block[key] for block in blocks) / len(blocks), 2)
+        
+        return {
+            "files_with_halstead": sum(len(blocks) for blocks in blocks_by_engine.values()),
+            "halstead_by_engine": {
+                engine: {
+                    "files": len(blocks),
+                    "avg_maintainability_index": average(blocks, 'maintainability_index'),
+                    "avg_halstead_volume": average(blocks, 'volume'),
+                    "avg_halstead_difficulty": average(blocks, 'difficulty'),
+                    "avg_halstead_effort": average(blocks, 'effort')
+                }
+                for engine, blocks in sorted(blocks_by_engine.items())
+            }
+        }
+    
+    def _ai_detection_summary(self, file_deltas: List[Dict], engine_mismatches: int) -> Dict:
+        """Likelihood counts and the medium/high likelihood files, most likely first."""
+        analyzed = [d for d in file_deltas if 'ai_likelihood' in d]
+        likelihood_counts = {}
+        for likelihood in ('LIKELIHOOD_HIGH', 'LIKELIHOOD_MEDIUM', 'LIKELIHOOD_LOW', 'LIKELIHOOD_MINIMAL'):
+            likelihood_counts[likelihood] = len([d for d in analyzed if d['ai_indicators'][-1] == likelihood])
+        likely = sorted((d for d in analyzed if d['ai_likelihood'] >= 0.4),
+                        key=lambda d: (-d['ai_likelihood'], d['file_path']))
+        return {
+            "files_analyzed": len(analyzed),
+            "files_skipped_engine_mismatch": engine_mismatches,
+            "likelihood_counts": likelihood_counts,
+            "likely_ai_files": [
+                {"file_path": d['file_path'], "ai_likelihood": d['ai_likelihood'], "ai_indicators": d['ai_indicators']}
+                for d in likely
+            ]
+        }
+    
     def compare_snapshots(self, baseline_snapshot: str, current_snapshot: str, 
                          output_file: Optional[str] = None,
                          detect_ai: bool = False) -> Dict:
@@ -341,9 +848,6 @@ class AIImpactAnalyzer:
         logger.info(f"  Baseline: {baseline_snapshot}")
         logger.info(f"  Current:  {current_snapshot}")
         
-        if detect_ai:
-            logger.warning("AI detection requested but Halstead metrics not yet integrated - skipping AI detection")
-        
         # Load snapshots
         with open(baseline_snapshot, 'r', encoding='utf-8') as f:
             baseline = json.load(f)
@@ -363,6 +867,7 @@ class AIImpactAnalyzer:
         
         # Calculate deltas for common files
         file_deltas = []
+        engine_mismatches = 0
         for file_path in common_files:
             base = baseline_files[file_path]
             curr = current_files[file_path]
@@ -379,6 +884,14 @@ class AIImpactAnalyzer:
                 "current_loc": curr['loc'],
                 "loc_change_pct": round((curr['loc'] - base['loc']) / base['loc'] * 100, 2) if base['loc'] > 0 else 0
             }
+            if detect_ai and base.get('halstead') and curr.get('halstead'):
+                # Halstead values from radon and the token counter are not comparable
+                if base['halstead'].get('engine') != curr['halstead'].get('engine'):
+                    engine_mismatches += 1
+                else:
+                    score, indicators = self.detect_ai_signature(base, curr)
+                    delta['ai_likelihood'] = round(score, 2)
+                    delta['ai_indicators'] = indicators
             file_deltas.append(delta)
         
         # Aggregate deltas
@@ -413,6 +926,15 @@ class AIImpactAnalyzer:
             }
         }
         
+        if detect_ai:
+            comparison_report['ai_detection'] = self._ai_detection_summary(file_deltas, engine_mismatches)
+            if engine_mismatches:
+                logger.warning(f"Skipped AI detection for {engine_mismatches} files whose Halstead metrics "
+                               "come from different engines in the two snapshots")
+            if not comparison_report['ai_detection']['files_analyzed'] and not engine_mismatches:
+                logger.warning("No files with Halstead metrics in both snapshots - "
+                               "create snapshots without --no-halstead to enable AI detection")
+        
         # Save report if output file specified
         if output_file:
             with open(output_file, 'w', encoding='utf-8') as f:
@@ -432,6 +954,16 @@ class AIImpactAnalyzer:
         print(f"\nTop 10 Changed Files (by LOC):")
         for i, delta in enumerate(comparison_report['file_deltas'][:10], 1):
             print(f"  {i}. {delta['file_path']}: {delta['loc_change']:+d} LOC ({delta['loc_change_pct']:+.1f}%)")
+        ai_detection = comparison_report.get('ai_detection')
+        if ai_detection and ai_detection['files_analyzed']:
+            print(f"\nAI Signature Detection ({ai_detection['files_analyzed']} files with Halstead metrics):")
+            for likelihood, count in ai_detection['likelihood_counts'].items():
+                print(f"  {likelihood}: {count}")
+            if ai_detection['files_skipped_engine_mismatch']:
+                print(f"  Skipped (Halstead engine mismatch): {ai_detection['files_skipped_engine_mismatch']}")
+            for i, candidate in enumerate(ai_detection['likely_ai_files'][:10], 1):
+                print(f"  {i}. {candidate['file_path']}: {candidate['ai_likelihood']:.2f} "
+                      f"({', '.join(candidate['ai_indicators'][:-1]) or '-'})")
         print("="*60 + "\n")
         
         return comparison_report
@@ -447,6 +979,16 @@ def main():
     snapshot_parser.add_argument('--name', help='Snapshot name (default: YYYY-QQ)')
     snapshot_parser.add_argument('--months', type=int, default=24, help='Months of history to include (default: 24)')
     snapshot_parser.add_argument('--no-halstead', action='store_true', help='Skip Halstead metrics (faster but no AI detection)')
+    snapshot_parser.add_argument('--jobs', type=int, default=1,
+                                 help='Reader threads and metric processes, or concurrent snapshots with several --at '
+                                      '(default: 1, serial; 0: one per CPU)')
+    snapshot_parser.add_argument('--at', action='append', metavar='REV|DATE',
+                                 help='Measure the code as of a commit or date (YYYY-MM-DD) from git objects, '
+                                      'without touching the working tree; repeat for several quarterly snapshots')
+    snapshot_parser.add_argument('--quality-cache', action='store_true',
+                                 help=f'Cache per-file Halstead metrics by git blob id in {default_quality_cache_path()}')
+    snapshot_parser.add_argument('--quality-cache-path', metavar='PATH',
+                                 help='Quality cache database to use instead of the default one (implies --quality-cache)')
     
     # Compare command
     compare_parser = subparsers.add_parser('compare', help='Compare two snapshots')
@@ -462,12 +1004,27 @@ def main():
         parser.print_help()
         sys.exit(1)
     
-    analyzer = AIImpactAnalyzer(args.repo_path)
+    quality_cache = getattr(args, 'quality_cache_path', None)
+    if quality_cache is None and getattr(args, 'quality_cache', False):
+        quality_cache = str(default_quality_cache_path())
+    analyzer = AIImpactAnalyzer(args.repo_path, jobs=getattr(args, 'jobs', 1), quality_cache=quality_cache)
     
     if args.command == 'snapshot':
         include_halstead = not getattr(args, 'no_halstead', False)
-        snapshot_file = analyzer.create_snapshot(args.name, args.months, include_halstead=include_halstead)
-        print(f"\n✅ Snapshot created: {snapshot_file}")
+        try:
+            if args.at and len(args.at) > 1:
+                if args.name:
+                    raise ValueError("--name cannot be used with several --at points")
+                snapshot_files = analyzer.create_historical_snapshots(args.at, args.months, include_halstead)
+            else:
+                snapshot_files = [analyzer.create_snapshot(args.name, args.months, include_halstead=include_halstead,
+                                                           at=args.at[0] if args.at else None)]
+        except ValueError as e:
+            print(f"\n❌ Error: {e}\n")
+            sys.exit(1)
+        print()
+        for snapshot_file in snapshot_files:
+            print(f"✅ Snapshot created: {snapshot_file}")
         if include_halstead:
             print("   📊 Halstead metrics included (AI detection enabled)")
             print("   💡 Tip: Use --no-halstead to skip Halstead for faster snapshots\n")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Code Quality Scanner Micro-Benchmark
+
+Measures per-MB throughput of `analyze_code_quality` (precompiled per-language
+scanners) against the original per-line, per-pattern implementation, and
+checks that both produce identical metrics on every input.
+
+Usage:
+    # Synthetic corpus (4 MB per language)
+    python bench_code_quality.py --mb 4
+    
+    # Source files from a repository at HEAD
+    python bench_code_quality.py --repo-path /path/to/repo
+    
+    # Machine-readable results
+    python bench_code_quality.py --json
+"""
+
+import argparse
+import json
+import random
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+from git_productivity_analyzer import LANGUAGE_EXTENSIONS, analyze_code_quality, decode_blob, GitBlobReader
+
+# Building blocks for synthetic source lines
+SYNTHETIC_TOKENS = [
+    'if', 'for', 'while', 'and', 'or', 'elif', 'except', 'case', 'catch', 'switch',
+    'a&&b', 'c||d', 'x ? y : z', 'value', 'count', 'items', '=', '+', '(', ')', '{', '}', ';', ':'
+]
+SYNTHETIC_LINE_STARTS = [
+    '', '', '', '    ', '        ', '# ', '// ', '/* ', ' * ', '"""', 'def run(x):', 'function go() {',
+    'public static int size(', 'int main(int argc) {', 'func Serve() {', 'const f = (a) => {'
+]
+
+def legacy_analyze_code_quality(code: str, language: str) -> Optional[Dict]:
+    """Reference implementation: analyze_code_quality before precompiled scanners.
+    
+    Returns language-agnostic metrics:
+    - loc: Lines of code (excluding blanks and comments)
+    - complexity: Estimated cyclomatic complexity
+    - comment_density: Ratio of comment lines to total lines
+    - avg_method_length: Average lines per function/method
+    """
+    try:
+        lines = code.split('\n')
+        total_lines = len(lines)
+        
+        # Count blank lines
+        blank_lines = sum(1 for line in lines if not line.strip())
+        
+        # Count comment lines (language-specific patterns)
+        comment_patterns = {
+            'python': [r'^\s*#', r'^\s*"""', r"^\s*'''"],
+            'java': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
+            'c': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
+            'cpp': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
+            'csharp': [r'^\s*//', r'^\s*/\*', r'^\s*\*', r'^\s*///'],
+            'javascript': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
+            'typescript': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
+            'go': [r'^\s*//', r'^\s*/\*', r'^\s*\*']
+        }
+        
+        patterns = comment_patterns.get(language, [r'^\s*//'])
+        comment_lines = 0
+        for line in lines:
+            if any(re.match(pattern, line) for pattern in patterns):
+                comment_lines += 1
+        
+        # Lines of code (excluding blanks and comments)
+        loc = total_lines - blank_lines - comment_lines
+        
+        # Comment density (percentage)
+        comment_density = (comment_lines / total_lines * 100) if total_lines > 0 else 0
+        
+        # Estimate cyclomatic complexity by counting decision points
+        complexity_patterns = {
+            'python': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\band\b', r'\bor\b', r'\belif\b', r'\bexcept\b'],
+            'java': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
+            'c': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
+            'cpp': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
+            'csharp': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
+            'javascript': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
+            'typescript': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
+            'go': [r'\bif\b', r'\bfor\b', r'\bswitch\b', r'\bcase\b', r'\b&&\b', r'\b\|\|\b']
+        }
+        
+        complexity = 1  # Base complexity
+        patterns = complexity_patterns.get(language, [r'\bif\b', r'\bfor\b', r'\bwhile\b'])
+        for pattern in patterns:
+            complexity += len(re.findall(pattern, code))
+        
+        # Count methods/functions to estimate average length
+        method_patterns = {
+            'python': r'^\s*def\s+\w+',
+            'java': r'^\s*(public|private|protected|static|\s)*\s+\w+\s+\w+\s*\(',
+            'c': r'^\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
+            'cpp': r'^\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
+            'csharp': r'^\s*(public|private|protected|static|\s)*\s+\w+\s+\w+\s*\(',
+            'javascript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|\w+\s*:\s*function)',
+            'typescript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|\w+\s*:\s*function)',
+            'go': r'^\s*func\s+\w+'
+        }
+        
+        pattern = method_patterns.get(language, r'^\s*def\s+\w+')
+        method_count = len(re.findall(pattern, code, re.MULTILINE))
+        avg_method_length = (loc / method_count) if method_count > 0 else loc
+        
+        return {
+            'loc': max(0, loc),
+            'complexity': max(1, complexity),
+            'comment_density': round(comment_density, 2),
+            'avg_method_length': round(avg_method_length, 2)
+        }
+    
+    except Exception as e:
+        logger.debug(f"Failed to analyze code quality: {e}")
+        return None
+
+
+def synthetic_corpus(language: str, megabytes: float, seed: int = 42) -> List[str]:
+    """Generate source-like files totalling roughly `megabytes` MB."""
+    rng = random.Random(seed)
+    target = int(megabytes * 1_000_000)
+    files = []
+    size = 0
+    while size < target:
+        lines = []
+        for _ in range(rng.randint(20, 400)):
+            start = rng.choice(SYNTHETIC_LINE_STARTS)
+            body = ' '.join(rng.choice(SYNTHETIC_TOKENS) for _ in range(rng.randint(0, 12)))
+            lines.append(start + body)
+        code = '\n'.join(lines)
+        files.append(code)
+        size += len(code.encode('utf-8'))
+    return files
+
+
+def repository_corpus(repo_path: str) -> Dict[str, List[str]]:
+    """Collect source files at HEAD, grouped by language."""
+    corpus: Dict[str, List[str]] = {}
+    listing = subprocess.run(['git', 'ls-tree', '-r', '-z', 'HEAD'], cwd=repo_path,
+                             capture_output=True, check=True).stdout.decode('utf-8', errors='replace')
+    with GitBlobReader(Path(repo_path)) as blobs:
+        for entry in listing.split('\0'):
+            meta, _, file_path = entry.partition('\t')
+            parts = meta.split()
+            if len(parts) != 3 or parts[1] != 'blob':
+                continue
+            for lang, extensions in LANGUAGE_EXTENSIONS.items():
+                if any(file_path.endswith(ext) for ext in extensions):
+                    data = blobs.read(parts[2])
+                    if data:
+                        corpus.setdefault(lang, []).append(decode_blob(data))
+                    break
+    return corpus
+
+
+def time_implementation(func, files: List[str], language: str, repeat: int) -> Tuple[float, List[Optional[Dict]]]:
+    """Best-of-`repeat` wall time for analyzing every file."""
+    best = float('inf')
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(code, language) for code in files]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark for analyze_code_quality')
+    parser.add_argument('--repo-path', help='Benchmark source files from this repository at HEAD instead of synthetic code')
+    parser.add_argument('--mb', type=float, default=2.0, help='Synthetic corpus size per language in MB (default: 2)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions, best is reported (default: 3)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    if args.repo_path:
+        corpus = repository_corpus(args.repo_path)
+    else:
+        corpus = {lang: synthetic_corpus(lang, args.mb) for lang in LANGUAGE_EXTENSIONS}
+    
+    results = []
+    mismatches = 0
+    for language, files in corpus.items():
+        megabytes = sum(len(code.encode('utf-8')) for code in files) / 1_000_000
+        if not megabytes:
+            continue
+        before, legacy_results = time_implementation(legacy_analyze_code_quality, files, language, args.repeat)
+        after, new_results = time_implementation(analyze_code_quality, files, language, args.repeat)
+        identical = legacy_results == new_results
+        mismatches += 0 if identical else 1
+        results.append({
+            'language': language,
+            'files': len(files),
+            'megabytes': round(megabytes, 3),
+            'before_mb_per_s': round(megabytes / before, 2),
+            'after_mb_per_s': round(megabytes / after, 2),
+            'speedup': round(before / after, 2),
+            'identical': identical
+        })
+    
+    if args.json:
+        print(json.dumps({'results': results}, indent=2))
+    else:
+        print(f"\n{'Language':<12} {'Files':<8} {'MB':<8} {'Before MB/s':<13} {'After MB/s':<12} {'Speedup':<9} {'Identical':<9}")
+        print("-" * 75)
+        for r in results:
+            print(f"{r['language']:<12} {r['files']:<8} {r['megabytes']:<8.2f} {r['before_mb_per_s']:<13.2f} "
+                  f"{r['after_mb_per_s']:<12.2f} {r['speedup']:<9.2f} {'yes' if r['identical'] else 'NO':<9}")
+        print()
+    
+    if mismatches:
+        logger.error(f"{mismatches} language(s) produced different metrics")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Analyzer Benchmark Suite - Synthetic Repositories
+
+Generates a git repository locally (through `git fast-import`, no network
+needed) at a configurable scale and times each phase of the measure-ai-impact
+tools on it:
+
+- log_parse: streaming and parsing `git log --numstat` (iter_commits_in_range)
+- analyze_commits: aggregating the parsed commits (analyze_commits)
+- quality_at_commit: quality metrics at HEAD (calculate_quality_at_commit)
+- snapshot_write: quarterly snapshots of the whole history (create_snapshots_since)
+- trend_report: trend report over those snapshots (print_trend_report)
+- aia_snapshot: ai_impact_analyzer metrics snapshot of the working tree (--no-halstead)
+- aia_snapshot_halstead: the same snapshot with Halstead/MI blocks, the CLI default
+- aia_compare: ai_impact_analyzer comparison of two snapshots
+
+Results are emitted as JSON (best and all run times, throughput, scale and
+environment), so throughput can be tracked across releases.
+
+Usage:
+    # Default scale (2000 commits, 500 files, 20 authors)
+    python benchmark_analyzers.py
+    
+    # Larger repository, selected phases, best of 5, results to a file
+    python benchmark_analyzers.py --commits 20000 --files 5000 --authors 200 \\
+        --phases log_parse analyze_commits --repeat 5 --output bench.json
+    
+    # Keep the generated repository and reuse it on the next run
+    python benchmark_analyzers.py --repo-dir /tmp/olaf-bench-repo
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+from git_productivity_analyzer import GitProductivityAnalyzer, NUMPY_AVAILABLE, RADON_AVAILABLE
+from ai_impact_analyzer import AIImpactAnalyzer
+
+PHASES = ('log_parse', 'analyze_commits', 'quality_at_commit', 'snapshot_write', 'trend_report',
+          'aia_snapshot', 'aia_snapshot_halstead', 'aia_compare')
+
+# Generation parameters of a repository, stored in it to decide reuse
+PARAMS_FILE = 'olaf-benchmark.json'
+
+# One function-sized unit of synthetic code per language: (extension, template)
+UNIT_TEMPLATES = [
+    ('.py', 'def func_{n}(value, limit={k}):\n'
+            '    """Compute item {n}."""\n'
+            '    total = 0\n'
+            '    for item in range(limit):\n'
+            '        if item % {m} == 0 and value:\n'
+            '            total += item * value\n'
+            '    return total\n'),
+    ('.js', '// Compute item {n}\n'
+            'function func{n}(value, limit = {k}) {{\n'
+            '  let total = 0;\n'
+            '  for (let item = 0; item < limit; item++) {{\n'
+            '    if (item % {m} === 0 && value) {{ total += item * value; }}\n'
+            '  }}\n'
+            '  return total;\n'
+            '}}\n'),
+    ('.java', '    /* Compute item {n} */\n'
+              '    public static int func{n}(int value) {{\n'
+              '        int total = 0;\n'
+              '        for (int item = 0; item < {k}; item++) {{\n'
+              '            if (item % {m} == 0 && value > 0) {{ total += item * value; }}\n'
+              '        }}\n'
+              '        return total;\n'
+              '    }}\n'),
+    ('.go', '// Func{n} computes item {n}\n'
+            'func Func{n}(value int) int {{\n'
+            '\ttotal := 0\n'
+            '\tfor item := 0; item < {k}; item++ {{\n'
+            '\t\tif item%{m} == 0 && value > 0 {{ total += item * value }}\n'
+            '\t}}\n'
+            '\treturn total\n'
+            '}}\n'),
+    ('.c', '/* Compute item {n} */\n'
+           'int func_{n}(int value) {{\n'
+           '    int total = 0;\n'
+           '    for (int item = 0; item < {k}; item++) {{\n'
+           '        if (item % {m} == 0 && value > 0) {{ total += item * value; }}\n'
+           '    }}\n'
+           '    return total;\n'
+           '}}\n'),
+]
+UNIT_LINES = 8
+
+
+class SyntheticRepo:
+    """Deterministic synthetic history written through `git fast-import`.
+    
+    The first commit adds every file; each later commit, by an author drawn
+    from a skewed distribution, replaces, appends or removes function units
+    in a few files. Commits are spread evenly over `span_days` ending now.
+    """
+    
+    def __init__(self, commits: int = 2000, files: int = 500, authors: int = 20,
+                 lines_per_file: int = 200, span_days: int = 730, seed: int = 42):
+        self.commits = commits
+        self.files = files
+        self.authors = authors
+        self.lines_per_file = lines_per_file
+        self.span_days = span_days
+        self.seed = seed
+    
+    def params(self) -> Dict:
+        return {'commits': self.commits, 'files': self.files, 'authors': self.authors,
+                'lines_per_file': self.lines_per_file, 'span_days': self.span_days, 'seed': self.seed}
+    
+    def _stream(self, rng: random.Random, end: datetime) -> Iterator[bytes]:
+        """fast-import commands, commit by commit."""
+        def data(text: str) -> bytes:
+            raw = text.encode('utf-8')
+            return b'data %d\n%s\n' % (len(raw), raw)
+        
+        def unit(ext: str) -> str:
+            template = next(t for e, t in UNIT_TEMPLATES if e == ext)
+            return template.format(n=rng.randrange(10 ** 6), k=rng.randint(2, 999), m=rng.randint(2, 9))
+        
+        paths = []
+        for i in range(self.files):
+            ext = UNIT_TEMPLATES[i % len(UNIT_TEMPLATES)][0]
+            paths.append(f"src/module_{i % 37}/file_{i}{ext}")
+        units_per_file = max(1, self.lines_per_file // UNIT_LINES)
+        contents = {path: [unit(Path(path).suffix) for _ in range(units_per_file)] for path in paths}
+        
+        people = [(f"Developer {i}", f"dev{i}@example.com") for i in range(self.authors)]
+        weights = [1 / (i + 1) for i in range(self.authors)]
+        start = end - timedelta(days=self.span_days)
+        step = (end - start).total_seconds() / max(self.commits, 1)
+        
+        for n in range(self.commits):
+            name, email = people[0] if n == 0 else rng.choices(people, weights)[0]
+            timestamp = int(start.timestamp() + n * step + rng.uniform(0, step / 2))
+            if n == 0:
+                touched = paths
+            else:
+                touched = rng.sample(paths, min(len(paths), 1 + int(rng.expovariate(1 / 3))))
+                for path in touched:
+                    units = contents[path]
+                    action = rng.random()
+                    if action < 0.6:
+                        units[rng.randrange(len(units))] = unit(Path(path).suffix)
+                    elif action < 0.85 or len(units) == 1:
+                        units.append(unit(Path(path).suffix))
+                    else:
+                        del units[rng.randrange(len(units))]
+            
+            chunks = [b'commit refs/heads/main\n',
+                      f"author {name} <{email}> {timestamp} +0000\n".encode('utf-8'),
+                      f"committer {name} <{email}> {timestamp} +0000\n".encode('utf-8'),
+                      data(f"Change {n}")]
+            for path in touched:
+                chunks.append(f"M 100644 inline {path}\n".encode('utf-8'))
+                chunks.append(data(''.join(contents[path])))
+            yield b''.join(chunks)
+    
+    def generate(self, repo_dir: Path) -> float:
+        """Create the repository in an empty directory and check it out; return seconds taken."""
+        started = time.perf_counter()
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        subprocess.run(['git', 'init', '-q'], cwd=repo_dir, check=True)
+        subprocess.run(['git', 'symbolic-ref', 'HEAD', 'refs/heads/main'], cwd=repo_dir, check=True)
+        
+        proc = subprocess.Popen(['git', 'fast-import', '--quiet'], cwd=repo_dir, stdin=subprocess.PIPE)
+        try:
+            for chunk in self._stream(random.Random(self.seed), datetime.now()):
+                proc.stdin.write(chunk)
+            proc.stdin.close()
+        finally:
+            if proc.wait() != 0:
+                raise RuntimeError(f"git fast-import failed with exit code {proc.returncode}")
+        
+        # ai_impact_analyzer reads the working tree
+        subprocess.run(['git', 'reset', '-q', '--hard'], cwd=repo_dir, check=True)
+        with open(repo_dir / '.git' / PARAMS_FILE, 'w') as f:
+            json.dump(self.params(), f)
+        return time.perf_counter() - started
+    
+    def matches(self, repo_dir: Path) -> bool:
+        """Whether repo_dir holds a repository generated with the same parameters."""
+        try:
+            with open(repo_dir / '.git' / PARAMS_FILE, 'r') as f:
+                return json.load(f) == self.params()
+        except (OSError, ValueError):
+            return False
+
+
+def repository_stats(repo_dir: Path) -> Dict:
+    """Commit count, file count and size of HEAD's tree."""
+    def git(*args) -> str:
+        return subprocess.run(['git'] + list(args), cwd=repo_dir, capture_output=True, text=True,
+                              check=True).stdout
+    
+    sizes = [int(line.split()[3]) for line in git('ls-tree', '-r', '-l', 'HEAD').splitlines()]
+    return {
+        'commits': int(git('rev-list', '--count', 'HEAD').strip()),
+        'files_at_head': len(sizes),
+        'bytes_at_head': sum(sizes)
+    }
+
+
+def time_phase(run: Callable[[], int], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """Run a phase `repeat` times; `run` returns the number of items processed."""
+    runs = []
+    cpu_runs = []
+    items = 0
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if setup:
+                setup()
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            items = run()
+        cpu_runs.append(time.process_time() - cpu_start)
+        runs.append(time.perf_counter() - wall_start)
+    best = min(runs)
+    return {
+        'seconds': round(best, 4),
+        'cpu_seconds': round(min(cpu_runs), 4),
+        'runs': [round(seconds, 4) for seconds in runs],
+        'items': items,
+        'items_per_second': round(items / best, 2) if best > 0 else None
+    }
+
+
+def run_benchmarks(repo_dir: Path, phases: List[str], repeat: int, span_days: int,
+                   analyzer_options: Dict) -> Dict[str, Dict]:
+    """Time each selected phase against the repository in repo_dir."""
+    analyzer = GitProductivityAnalyzer(str(repo_dir), **analyzer_options)
+    end = datetime.now() + timedelta(days=1)
+    start = end - timedelta(days=span_days + 2)
+    since = start.strftime('%Y-%m-%d')
+    head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir, capture_output=True, text=True,
+                          check=True).stdout.strip()
+    commits: List = []
+    
+    def log_parse() -> int:
+        commits[:] = analyzer.get_commits_in_range(start, end)
+        return len(commits)
+    
+    def analyze_commits() -> int:
+        analyzer.analyze_commits(commits)
+        return len(commits)
+    
+    def quality_at_commit() -> int:
+        metrics = analyzer.calculate_quality_at_commit(head)
+        return metrics['files_analyzed'] if metrics else 0
+    
+    def snapshot_write() -> int:
+        return len(analyzer.create_snapshots_since(since))
+    
+    def trend_report() -> int:
+        analyzer.print_trend_report()
+        return len(list(analyzer.snapshots_dir.glob('snapshot-*.json')))
+    
+    aia = AIImpactAnalyzer(str(repo_dir), jobs=analyzer_options.get('workers', 1))
+    months = span_days // 30 + 1
+    
+    def aia_snapshot() -> int:
+        with open(aia.create_snapshot('bench-current', months), 'r', encoding='utf-8') as f:
+            return json.load(f)['metadata']['total_files']
+    
+    def aia_snapshot_halstead() -> int:
+        with open(aia.create_snapshot('bench-halstead', months, include_halstead=True), 'r', encoding='utf-8') as f:
+            return json.load(f)['metadata']['total_files']
+    
+    def aia_compare() -> int:
+        report = aia.compare_snapshots(str(aia.snapshots_dir / 'snapshot-bench-baseline.json'),
+                                       str(aia.snapshots_dir / 'snapshot-bench-current.json'))
+        return report['aggregate_delta']['files_modified']
+    
+    # Prerequisites of a phase are produced untimed when their own phase is not selected
+    def needs_commits():
+        if not commits:
+            log_parse()
+    
+    def needs_snapshots():
+        if not any(analyzer.snapshots_dir.glob('snapshot-*.json')):
+            snapshot_write()
+    
+    def needs_aia_snapshots():
+        if not (aia.snapshots_dir / 'snapshot-bench-baseline.json').exists():
+            aia.create_snapshot('bench-baseline', months)
+        if not (aia.snapshots_dir / 'snapshot-bench-current.json').exists():
+            aia_snapshot()
+    
+    plan = {
+        'log_parse': (log_parse, None),
+        'analyze_commits': (analyze_commits, needs_commits),
+        'quality_at_commit': (quality_at_commit, None),
+        'snapshot_write': (snapshot_write, None),
+        'trend_report': (trend_report, needs_snapshots),
+        'aia_snapshot': (aia_snapshot, None),
+        'aia_snapshot_halstead': (aia_snapshot_halstead, None),
+        'aia_compare': (aia_compare, needs_aia_snapshots),
+    }
+    
+    results = {}
+    for phase in phases:
+        run, setup = plan[phase]
+        logger.info(f"Timing {phase} ({repeat}x)...")
+        results[phase] = time_phase(run, repeat, setup)
+        logger.info(f"  {phase}: {results[phase]['seconds']:.3f}s, {results[phase]['items']} items")
+    return results
+
+
+def git_version() -> str:
+    result = subprocess.run(['git', '--version'], capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the measure-ai-impact tools on a synthetic git repository')
+    parser.add_argument('--commits', type=int, default=2000, help='Commits to generate (default: 2000)')
+    parser.add_argument('--files', type=int, default=500, help='Source files in the repository (default: 500)')
+    parser.add_argument('--authors', type=int, default=20, help='Distinct authors (default: 20)')
+    parser.add_argument('--lines-per-file', type=int, default=200, help='Initial lines per file (default: 200)')
+    parser.add_argument('--span-days', type=int, default=730, help='Days of history, ending today (default: 730)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES), help='Phases to time (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per phase, best is reported (default: 3)')
+    parser.add_argument('--workers', type=int, default=1, help='Quality metric processes, and ai_impact_analyzer --jobs (default: 1; 0: one per CPU)')
+    parser.add_argument('--repo-dir', help='Generate the repository here and keep it; reused when generated with the same parameters')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show analyzer logging')
+    args = parser.parse_args()
+    
+    if not args.verbose:
+        logging.getLogger('git_productivity_analyzer').setLevel(logging.WARNING)
+        logging.getLogger('ai_impact_analyzer').setLevel(logging.WARNING)
+    
+    synthetic = SyntheticRepo(args.commits, args.files, args.authors, args.lines_per_file,
+                              args.span_days, args.seed)
+    temp_dir = None
+    if args.repo_dir:
+        repo_dir = Path(args.repo_dir).resolve()
+    else:
+        temp_dir = tempfile.mkdtemp(prefix='olaf-bench-')
+        repo_dir = Path(temp_dir) / 'repo'
+    
+    try:
+        generate_seconds = None
+        if synthetic.matches(repo_dir):
+            logger.info(f"Reusing synthetic repository {repo_dir}")
+            # Start from a clean slate of outputs
+            shutil.rmtree(repo_dir / 'olaf-data', ignore_errors=True)
+        else:
+            if repo_dir.exists() and any(repo_dir.iterdir()):
+                parser.error(f"--repo-dir {repo_dir} is not empty and was not generated with these parameters")
+            logger.info(f"Generating synthetic repository in {repo_dir}...")
+            generate_seconds = round(synthetic.generate(repo_dir), 3)
+        
+        phases = [phase for phase in PHASES if phase in args.phases]
+        results = run_benchmarks(repo_dir, phases, args.repeat, args.span_days, {'workers': args.workers})
+        
+        report = {
+            'metadata': {
+                'created': datetime.now().isoformat(),
+                'repeat': args.repeat,
+                'workers': args.workers,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'git': git_version(),
+                'numpy_available': NUMPY_AVAILABLE,
+                'radon_available': RADON_AVAILABLE
+            },
+            'repository': dict(synthetic.params(), **repository_stats(repo_dir),
+                               generate_seconds=generate_seconds),
+            'phases': results
+        }
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        logger.info(f"Results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
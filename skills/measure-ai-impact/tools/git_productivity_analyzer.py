@@ -25,17 +25,31 @@ Usage:
     python git_productivity_analyzer.py report
 """
 
+import ast
 import json
+import math
+import os
 import subprocess
 import argparse
+import contextlib
+import cProfile
+import hashlib
 import sys
+import sqlite3
+import tempfile
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
+from bisect import bisect_right
 import re
-
 import logging
+
+from identity_resolver import IdentityResolver
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -49,6 +63,29 @@ except ImportError:
     logger.warning("radon library not available. Install with: pip install radon")
     logger.warning("Halstead/MI metrics will be unavailable for Python files.")
 
+# AST-level radon API, for computing all radon metrics from a single parse
+try:
+    from radon.metrics import h_visit_ast, mi_compute
+    from radon.raw import analyze as radon_raw_analyze
+    from radon.visitors import ComplexityVisitor
+    RADON_AST_API = True
+except ImportError:
+    RADON_AST_API = False
+
+# NumPy is optional: it vectorizes commit aggregation over CommitColumns
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# resource is POSIX-only: profiles leave out peak RSS without it
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
 # Language file extensions mapping
 LANGUAGE_EXTENSIONS = {
     'python': ['.py'],
@@ -61,23 +98,1354 @@ LANGUAGE_EXTENSIONS = {
     'go': ['.go']
 }
 
+# Time series bucket sizes and the headline metrics stored per bucket
+TIMESERIES_BUCKETS = ('day', 'week', 'month', 'quarter')
+TIMESERIES_FIELDS = ('commits', 'active_days', 'contributors', 'additions', 'deletions', 'total_churn',
+                     'net_churn', 'avg_churn_per_commit', 'avg_files_per_commit', 'rework_ratio',
+                     'small_commits', 'medium_commits', 'large_commits', 'huge_commits')
+
+# Commit size buckets by churn: small < 50 <= medium < 200 <= large < 1000 <= huge
+COMMIT_SIZE_BOUNDS = [50, 200, 1000]
+
+# Index of snapshot headline metrics (deliberately not matching snapshot-*.json)
+SNAPSHOT_INDEX_FILE = 'snapshots-index.json'
+SNAPSHOT_INDEX_VERSION = 2
+
+# Per-contributor fields kept in the index for trend reports and fleet rollups
+CONTRIBUTOR_TOTAL_KEYS = ('email', 'name', 'commit_count', 'additions', 'deletions', 'total_churn')
+
+# Prefix of each commit header in NUL-delimited `git log -z` output.
+# Numstat records always start with a digit or '-', so they cannot collide.
+COMMIT_MARKER = '\x01'
+
+# Marker+Hash|Author Name|Author Email|Timestamp|Commit Timestamp|Subject, NUL-separated
+LOG_FORMAT = f'{COMMIT_MARKER}%H%x00%an%x00%ae%x00%at%x00%ct%x00%s'
+
+# Extra `git log` options of rename-aware mode: rename and copy detection, plus
+# raw entries (status letter and full blob ids) ahead of the numstat entries
+RENAME_LOG_OPTIONS = ['-M', '-C', '--raw', '--no-abbrev']
+
+# All-zero blob id of a missing side (added or deleted file) in raw entries
+NULL_OID = '0' * 40
+
+# Counters of the rename_metrics analysis section (rename-aware mode only)
+RENAME_METRIC_KEYS = ('renamed_files', 'copied_files', 'rename_churn', 'binary_files',
+                      'binary_bytes_added', 'binary_bytes_removed')
+
+# Persistent per-commit cache, stored next to the snapshots
+COMMIT_CACHE_FILE = 'commit-cache.sqlite'
+
+# Content-addressed per-file quality cache, shared across repositories.
+# Bump QUALITY_ANALYZER_VERSION whenever analyze_code_quality's output changes.
+QUALITY_CACHE_FILE = 'quality-metrics.sqlite'
+QUALITY_ANALYZER_VERSION = 1
+# Bump RADON_METRICS_VERSION whenever radon_file_metrics' output changes.
+RADON_METRICS_VERSION = 1
+QUALITY_CACHE_MAX_ENTRIES = 500000
+
+# Per-path quality metrics of the last analyzed commit (incremental mode)
+QUALITY_TABLE_FILE = 'quality-table.json'
+
+# Path fragments excluded from quality analysis
+EXCLUDED_PATH_PARTS = ['.venv/', 'venv/', 'node_modules/', '__pycache__/',
+                       'site-packages/', '.git/', 'target/', 'build/', 'dist/',
+                       'vendor/', '.gradle/', 'bin/', 'obj/']
+
+# Built-in path profile (`--path-profile vendored`): dependencies, build output,
+# minified bundles, lockfiles and linguist-generated files
+VENDORED_PATH_PROFILE = {
+    'exclude': ['**/vendor/**', '**/node_modules/**', '**/bower_components/**', '**/dist/**',
+                '**/build/**', '**/target/**', '**/.venv/**', '**/venv/**', '**/site-packages/**',
+                '**/__pycache__/**', '**/*.min.js', '**/*.min.css', '**/*.map',
+                '**/package-lock.json', '**/npm-shrinkwrap.json', '**/yarn.lock', '**/pnpm-lock.yaml',
+                '**/poetry.lock', '**/Pipfile.lock', '**/Cargo.lock', '**/Gemfile.lock',
+                '**/composer.lock', '**/go.sum'],
+    'exclude_generated': True
+}
+
+# Object id of the empty tree, to list a commit's files as a diff against nothing
+EMPTY_TREE_OID = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+# Files per task when quality analysis runs on a process pool
+QUALITY_CHUNK_SIZE = 32
+
+
+class CommitColumns:
+    """Columnar store of per-commit numbers with an interned author table.
+    
+    Each commit costs a handful of machine integers (timestamp, additions,
+    deletions, files, author id) instead of a dict, and every metric is
+    computed from the columns with group-by operations - vectorized with
+    NumPy when it is installed, plain loops over the arrays otherwise.
+    
+    Results do not depend on the order commits arrive in (git's walk order,
+    or the commit cache's date order, which differ when committer dates are
+    skewed): commits are ranked by (committer timestamp, hash). The quality
+    commit `last_hash` is the lowest ranked one, an author's display name
+    comes from their highest ranked commit, and contributors with equal
+    commit counts are listed by their highest ranked commit, newest first.
+    """
+    
+    # Local dates are resolved per 15-minute bucket: every UTC offset and
+    # DST transition in use falls on a 15-minute boundary.
+    DATE_BUCKET_SECONDS = 900
+    
+    def __init__(self, resolver: Optional[IdentityResolver] = None, track_renames: bool = False):
+        self.resolver = resolver
+        self.timestamps = array('q')
+        self.additions = array('q')
+        self.deletions = array('q')
+        self.files = array('q')
+        self.author_ids = array('q')
+        # Interned authors: email (or canonical identity) -> id, and id -> name on their newest commit
+        self.author_index: Dict[str, int] = {}
+        self.author_emails: List[str] = []
+        self.author_names: List[str] = []
+        self.author_newest: List[Tuple[int, str]] = []
+        # Oldest commit by (committer timestamp, hash): where quality is measured
+        self.last_hash: Optional[str] = None
+        self.last_rank: Optional[Tuple[int, str]] = None
+        # Rename/copy and binary size totals, from rename-aware commit records
+        self.rename_totals: Optional[Dict[str, int]] = dict.fromkeys(RENAME_METRIC_KEYS, 0) if track_renames else None
+    
+    @property
+    def total_commits(self) -> int:
+        return len(self.timestamps)
+    
+    def _author_id(self, email: str, name: str, rank: Tuple[int, str]) -> int:
+        key = email
+        if self.resolver is not None:
+            key, name, email = self.resolver.resolve(name, email)
+        author_id = self.author_index.get(key)
+        if author_id is None:
+            author_id = self.author_index[key] = len(self.author_emails)
+            self.author_emails.append(email)
+            self.author_names.append(name)
+            self.author_newest.append(rank)
+        elif rank > self.author_newest[author_id]:
+            self.author_names[author_id] = name
+            self.author_newest[author_id] = rank
+        return author_id
+    
+    def _rank_last(self, hash: str, rank: Tuple[int, str]):
+        if self.last_rank is None or rank < self.last_rank:
+            self.last_hash, self.last_rank = hash, rank
+    
+    def add(self, commit: Dict):
+        """Append one commit."""
+        self.timestamps.append(commit['timestamp'])
+        self.additions.append(commit['additions'])
+        self.deletions.append(commit['deletions'])
+        self.files.append(commit['file_count'])
+        rank = (commit['committer_timestamp'], commit['hash'])
+        self.author_ids.append(self._author_id(commit['author_email'], commit['author_name'], rank))
+        self._rank_last(commit['hash'], rank)
+        if self.rename_totals is not None:
+            self._add_rename_totals(commit['files_changed'])
+    
+    def _add_rename_totals(self, files_changed: Iterable):
+        totals = self.rename_totals
+        for change in files_changed:
+            status = change.get('status')
+            if status == 'R':
+                totals['renamed_files'] += 1
+            elif status == 'C':
+                totals['copied_files'] += 1
+            if status in ('R', 'C'):
+                totals['rename_churn'] += change['additions'] + change['deletions']
+            binary_delta = change.get('binary_delta')
+            if binary_delta is not None:
+                totals['binary_files'] += 1
+                if binary_delta > 0:
+                    totals['binary_bytes_added'] += binary_delta
+                else:
+                    totals['binary_bytes_removed'] -= binary_delta
+    
+    def extend(self, other: 'CommitColumns'):
+        """Append all commits of another store."""
+        remap = [self._author_id(email, name, rank)
+                 for email, name, rank in zip(other.author_emails, other.author_names, other.author_newest)]
+        self.timestamps.extend(other.timestamps)
+        self.additions.extend(other.additions)
+        self.deletions.extend(other.deletions)
+        self.files.extend(other.files)
+        self.author_ids.extend(remap[author_id] for author_id in other.author_ids)
+        if other.last_hash is not None:
+            self._rank_last(other.last_hash, other.last_rank)
+        if self.rename_totals is not None and other.rename_totals is not None:
+            for key, value in other.rename_totals.items():
+                self.rename_totals[key] += value
+    
+    def active_dates(self) -> List:
+        """Sorted distinct local commit dates."""
+        if NUMPY_AVAILABLE:
+            buckets = np.unique(np.frombuffer(self.timestamps, dtype=np.int64) // self.DATE_BUCKET_SECONDS).tolist()
+        else:
+            buckets = {ts // self.DATE_BUCKET_SECONDS for ts in self.timestamps}
+        return sorted({datetime.fromtimestamp(bucket * self.DATE_BUCKET_SECONDS).date() for bucket in buckets})
+    
+    def _totals(self) -> Tuple[int, int, int, List[int], List[List[int]]]:
+        """Column sums, size histogram and per-author [commits, additions, deletions, churn]."""
+        n_authors = len(self.author_emails)
+        if NUMPY_AVAILABLE:
+            additions = np.frombuffer(self.additions, dtype=np.int64)
+            deletions = np.frombuffer(self.deletions, dtype=np.int64)
+            churn = additions + deletions
+            author_ids = np.frombuffer(self.author_ids, dtype=np.int64)
+            sizes = np.bincount(np.searchsorted(COMMIT_SIZE_BOUNDS, churn, side='right'),
+                                minlength=len(COMMIT_SIZE_BOUNDS) + 1).tolist()
+            per_author = [
+                np.bincount(author_ids, minlength=n_authors).tolist(),
+                # int64 weights are summed as float64: exact below 2**53 lines
+                np.rint(np.bincount(author_ids, weights=additions, minlength=n_authors)).astype(np.int64).tolist(),
+                np.rint(np.bincount(author_ids, weights=deletions, minlength=n_authors)).astype(np.int64).tolist()
+            ]
+            totals = int(additions.sum()), int(deletions.sum()), int(np.frombuffer(self.files, dtype=np.int64).sum())
+        else:
+            sizes = [0] * (len(COMMIT_SIZE_BOUNDS) + 1)
+            per_author = [[0] * n_authors for _ in range(3)]
+            commit_counts, author_additions, author_deletions = per_author
+            for author_id, additions, deletions in zip(self.author_ids, self.additions, self.deletions):
+                commit_counts[author_id] += 1
+                author_additions[author_id] += additions
+                author_deletions[author_id] += deletions
+                sizes[bisect_right(COMMIT_SIZE_BOUNDS, additions + deletions)] += 1
+            totals = sum(self.additions), sum(self.deletions), sum(self.files)
+        
+        authors = [[commits, additions, deletions, additions + deletions]
+                   for commits, additions, deletions in zip(*per_author)]
+        return totals + (sizes, authors)
+    
+    def to_analysis(self) -> Dict:
+        """Build the analysis structure (without quality metrics)."""
+        total_commits = self.total_commits
+        total_additions, total_deletions, total_files, sizes, authors = self._totals()
+        total_churn = total_additions + total_deletions
+        net_churn = total_additions - total_deletions
+        
+        # Time-based metrics
+        dates = self.active_dates()
+        date_range_days = (dates[-1] - dates[0]).days + 1 if dates else 1
+        active_days = len(dates)
+        
+        # Commit frequency
+        commits_per_day = total_commits / max(date_range_days, 1)
+        commits_per_active_day = total_commits / max(active_days, 1)
+        commits_per_week = commits_per_day * 7
+        
+        # Commit size metrics
+        avg_churn_per_commit = total_churn / total_commits if total_commits else 0
+        avg_files_per_commit = total_files / total_commits if total_commits else 0
+        avg_additions_per_commit = total_additions / total_commits if total_commits else 0
+        avg_deletions_per_commit = total_deletions / total_commits if total_commits else 0
+        
+        # Rework ratio (deletions/additions - high = lots of rework)
+        rework_ratio = total_deletions / total_additions if total_additions > 0 else 0
+        
+        # Contributor metrics
+        contributor_stats = []
+        for author_id, (commit_count, contrib_additions, contrib_deletions, contrib_churn) in enumerate(authors):
+            contributor_stats.append({
+                'email': self.author_emails[author_id],
+                'name': self.author_names[author_id],
+                'commit_count': commit_count,
+                'additions': contrib_additions,
+                'deletions': contrib_deletions,
+                'total_churn': contrib_churn,
+                'net_churn': contrib_additions - contrib_deletions,
+                'avg_churn_per_commit': contrib_churn / commit_count,
+                'commit_percentage': (commit_count / total_commits * 100)
+            })
+        
+        # Sort contributors by commit count, then by their newest commit
+        order = sorted(range(len(contributor_stats)),
+                       key=lambda author_id: (authors[author_id][0], self.author_newest[author_id]), reverse=True)
+        contributor_stats = [contributor_stats[author_id] for author_id in order]
+        
+        analysis = {
+            'commit_metrics': {
+                'total_commits': total_commits,
+                'commits_per_day': round(commits_per_day, 2),
+                'commits_per_active_day': round(commits_per_active_day, 2),
+                'commits_per_week': round(commits_per_week, 2),
+                'active_days': active_days,
+                'total_days_in_range': date_range_days
+            },
+            'churn_metrics': {
+                'total_additions': total_additions,
+                'total_deletions': total_deletions,
+                'total_churn': total_churn,
+                'net_churn': net_churn,
+                'avg_churn_per_commit': round(avg_churn_per_commit, 2),
+                'avg_additions_per_commit': round(avg_additions_per_commit, 2),
+                'avg_deletions_per_commit': round(avg_deletions_per_commit, 2),
+                'avg_files_per_commit': round(avg_files_per_commit, 2),
+                'rework_ratio': round(rework_ratio, 3)
+            },
+            'commit_size_distribution': {
+                'small_commits_under_50': sizes[0],
+                'medium_commits_50_200': sizes[1],
+                'large_commits_200_1000': sizes[2],
+                'huge_commits_over_1000': sizes[3]
+            },
+            'contributor_metrics': {
+                'total_contributors': len(authors),
+                'contributors': contributor_stats,
+                'churn_per_contributor': round(total_churn / len(authors), 2) if authors else 0
+            }
+        }
+        if self.rename_totals is not None:
+            analysis['rename_metrics'] = rename_metrics(self.rename_totals)
+        return analysis
+
+
+class FileChange:
+    """One numstat entry of a commit; readable as `change['file']` too.
+    
+    In rename-aware mode `status` is the raw diff status letter (e.g. 'R'
+    for a rename, 'C' for a copy, with the source path in `old_file`), and
+    binary files carry their blob size change in bytes as `binary_delta`.
+    These are None otherwise and left out of `to_dict`.
+    """
+    
+    __slots__ = ('file', 'additions', 'deletions', 'status', 'old_file', 'binary_delta')
+    
+    def __init__(self, file: str, additions: int, deletions: int, status: Optional[str] = None,
+                 old_file: Optional[str] = None, binary_delta: Optional[int] = None):
+        self.file = file
+        self.additions = additions
+        self.deletions = deletions
+        self.status = status
+        self.old_file = old_file
+        self.binary_delta = binary_delta
+    
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        value = getattr(self, key) if key in self.__slots__ else None
+        return default if value is None else value
+    
+    def to_dict(self) -> Dict:
+        change = {'file': self.file, 'additions': self.additions, 'deletions': self.deletions}
+        for key in ('status', 'old_file', 'binary_delta'):
+            value = getattr(self, key)
+            if value is not None:
+                change[key] = value
+        return change
+
+
+class CommitRecord:
+    """A parsed commit with its numstat entries.
+    
+    Slotted, with interned author and file path strings, so long histories
+    cost a fraction of the equivalent dicts. `date`, `total_churn`,
+    `net_churn` and `file_count` are derived on access. Records keep the
+    read-only dict interface (`commit['hash']`, `get`, `keys`) of the dicts
+    they replace, and `to_dict` gives that dict back.
+    """
+    
+    __slots__ = ('hash', 'author_name', 'author_email', 'timestamp', 'committer_timestamp',
+                 'subject', 'files_changed', 'additions', 'deletions')
+    
+    KEYS = ('hash', 'author_name', 'author_email', 'timestamp', 'committer_timestamp', 'date',
+            'subject', 'files_changed', 'additions', 'deletions', 'total_churn', 'net_churn', 'file_count')
+    
+    def __init__(self, hash: str, author_name: str, author_email: str, timestamp: int,
+                 committer_timestamp: int, subject: str, files_changed: Optional[List[FileChange]] = None,
+                 additions: int = 0, deletions: int = 0):
+        self.hash = hash
+        self.author_name = sys.intern(author_name)
+        self.author_email = sys.intern(author_email)
+        self.timestamp = timestamp
+        self.committer_timestamp = committer_timestamp
+        self.subject = subject
+        self.files_changed = files_changed if files_changed is not None else []
+        self.additions = additions
+        self.deletions = deletions
+    
+    def add_file(self, file: str, additions: int, deletions: int, status: Optional[str] = None,
+                 old_file: Optional[str] = None, binary_delta: Optional[int] = None):
+        self.files_changed.append(FileChange(sys.intern(file), additions, deletions, status,
+                                             sys.intern(old_file) if old_file else None, binary_delta))
+        self.additions += additions
+        self.deletions += deletions
+    
+    @property
+    def date(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+    
+    @property
+    def total_churn(self) -> int:
+        return self.additions + self.deletions
+    
+    @property
+    def net_churn(self) -> int:
+        return self.additions - self.deletions
+    
+    @property
+    def file_count(self) -> int:
+        return len(self.files_changed)
+    
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+    
+    def keys(self):
+        return self.KEYS
+    
+    def to_dict(self) -> Dict:
+        """The commit as a plain dict (as returned before CommitRecord existed)."""
+        commit = {key: getattr(self, key) for key in self.KEYS}
+        commit['files_changed'] = [change.to_dict() for change in self.files_changed]
+        return commit
+    
+    @classmethod
+    def from_dict(cls, commit: Dict) -> 'CommitRecord':
+        """Rebuild a record from `to_dict` output; derived keys are ignored."""
+        record = cls(commit['hash'], commit['author_name'], commit['author_email'], commit['timestamp'],
+                     commit['committer_timestamp'], commit['subject'])
+        for change in commit['files_changed']:
+            record.add_file(change['file'], change['additions'], change['deletions'],
+                            change.get('status'), change.get('old_file'), change.get('binary_delta'))
+        return record
+
+
+def headline_metrics(analysis: Dict) -> Dict:
+    """Flat headline numbers of an analysis, as used by time series."""
+    cm = analysis['commit_metrics']
+    chm = analysis['churn_metrics']
+    sizes = analysis['commit_size_distribution']
+    return {
+        'commits': cm['total_commits'],
+        'active_days': cm['active_days'],
+        'contributors': analysis['contributor_metrics']['total_contributors'],
+        'additions': chm['total_additions'],
+        'deletions': chm['total_deletions'],
+        'total_churn': chm['total_churn'],
+        'net_churn': chm['net_churn'],
+        'avg_churn_per_commit': chm['avg_churn_per_commit'],
+        'avg_files_per_commit': chm['avg_files_per_commit'],
+        'rework_ratio': chm['rework_ratio'],
+        'small_commits': sizes['small_commits_under_50'],
+        'medium_commits': sizes['medium_commits_50_200'],
+        'large_commits': sizes['large_commits_200_1000'],
+        'huge_commits': sizes['huge_commits_over_1000']
+    }
+
+
+def rename_metrics(totals: Dict[str, int]) -> Dict:
+    """The rename_metrics analysis section from CommitColumns.rename_totals."""
+    metrics = dict(totals)
+    metrics['binary_net_bytes'] = totals['binary_bytes_added'] - totals['binary_bytes_removed']
+    return metrics
+
+
+def decode_blob(data: bytes) -> str:
+    """Decode blob bytes the way `_run_git` decodes text output.
+    
+    UTF-8 with replacement, universal newlines and surrounding whitespace
+    stripped, so metrics match those computed from `git show` output.
+    """
+    text = data.decode('utf-8', errors='replace')
+    return text.replace('\r\n', '\n').replace('\r', '\n').strip()
+
+
+class GitBlobReader:
+    """Reads blob contents through one long-lived `git cat-file --batch` process.
+    
+    Each request is an object id on stdin; the reply is a header line
+    `<oid> <type> <size>` followed by exactly `size` bytes and a newline.
+    """
+    
+    def __init__(self, repo_path: Path):
+        self.proc = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.bytes_read = 0
+    
+    def read(self, oid: str) -> Optional[bytes]:
+        """Return the raw contents of an object, or None if it is missing."""
+        self.proc.stdin.write(oid.encode('ascii') + b'\n')
+        self.proc.stdin.flush()
+        
+        header = self.proc.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file --batch exited unexpectedly")
+        self.bytes_read += len(header)
+        parts = header.split()
+        if len(parts) != 3:
+            # "<oid> missing" or "<oid> ambiguous"
+            return None
+        
+        size = int(parts[2])
+        data = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)  # trailing newline
+        self.bytes_read += size + 1
+        return data
+    
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+        self.proc.stdout.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class GitObjectSizes:
+    """Looks up object sizes through one long-lived `git cat-file --batch-check` process.
+    
+    Each request is an object id on stdin; the reply is a single line
+    `<oid> <type> <size>` (or `<oid> missing`).
+    """
+    
+    def __init__(self, repo_path: Path):
+        self.proc = subprocess.Popen(
+            ['git', 'cat-file', '--batch-check'],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.bytes_read = 0
+    
+    def size(self, oid: str) -> int:
+        """Size of an object in bytes; 0 for the null id or a missing object."""
+        if oid == NULL_OID:
+            return 0
+        self.proc.stdin.write(oid.encode('ascii') + b'\n')
+        self.proc.stdin.flush()
+        
+        header = self.proc.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file --batch-check exited unexpectedly")
+        self.bytes_read += len(header)
+        parts = header.split()
+        return int(parts[2]) if len(parts) == 3 else 0
+    
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+        self.proc.stdout.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Comment markers per language, matched after leading whitespace
+COMMENT_MARKERS = {
+    'python': ['#', '"""', "'''"],
+    'java': ['//', '/*', '*'],
+    'c': ['//', '/*', '*'],
+    'cpp': ['//', '/*', '*'],
+    'csharp': ['//', '/*', '*', '///'],
+    'javascript': ['//', '/*', '*'],
+    'typescript': ['//', '/*', '*'],
+    'go': ['//', '/*', '*']
+}
+
+# Decision points used to estimate cyclomatic complexity. Keywords count as
+# whole words, bounded operators only with word characters on both sides
+# (`a&&b`, the historical `\b&&\b` behaviour) and the ternary '?' anywhere.
+DECISION_POINTS = {
+    'python': {'keywords': ['if', 'for', 'while', 'and', 'or', 'elif', 'except'], 'bounded_operators': [], 'ternary': False},
+    'java': {'keywords': ['if', 'for', 'while', 'case', 'catch'], 'bounded_operators': ['&&', '||'], 'ternary': True},
+    'c': {'keywords': ['if', 'for', 'while', 'case'], 'bounded_operators': ['&&', '||'], 'ternary': True},
+    'cpp': {'keywords': ['if', 'for', 'while', 'case', 'catch'], 'bounded_operators': ['&&', '||'], 'ternary': True},
+    'csharp': {'keywords': ['if', 'for', 'while', 'case', 'catch'], 'bounded_operators': ['&&', '||'], 'ternary': True},
+    'javascript': {'keywords': ['if', 'for', 'while', 'case', 'catch'], 'bounded_operators': ['&&', '||'], 'ternary': True},
+    'typescript': {'keywords': ['if', 'for', 'while', 'case', 'catch'], 'bounded_operators': ['&&', '||'], 'ternary': True},
+    'go': {'keywords': ['if', 'for', 'switch', 'case'], 'bounded_operators': ['&&', '||'], 'ternary': False}
+}
+
+# Function/method declarations, used to estimate average method length
+METHOD_PATTERNS = {
+    'python': r'^\s*def\s+\w+',
+    'java': r'^\s*(public|private|protected|static|\s)*\s+\w+\s+\w+\s*\(',
+    'c': r'^\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
+    'cpp': r'^\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
+    'csharp': r'^\s*(public|private|protected|static|\s)*\s+\w+\s+\w+\s*\(',
+    'javascript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|\w+\s*:\s*function)',
+    'typescript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|\w+\s*:\s*function)',
+    'go': r'^\s*func\s+\w+'
+}
+
+
+class CodeQualityScanner:
+    """Precompiled patterns that compute analyze_code_quality counts for one language.
+    
+    Three scans over the text replace the per-line, per-pattern matching:
+    - one named-group alternation classifies every line as blank or comment
+    - one alternation counts all decision points, behind a first-character
+      lookahead so most positions are rejected without trying each branch
+    - the method regex, which keeps its own scan because its `^\s*` may
+      span lines and fusing it would change which declarations are counted
+    """
+    
+    def __init__(self, comment_markers: List[str], keywords: List[str],
+                 bounded_operators: List[str], ternary: bool, method_pattern: str):
+        markers = '|'.join(re.escape(marker) for marker in comment_markers)
+        self.line_re = re.compile(
+            rf'^(?:(?P<blank>[^\S\n]*$)|[^\S\n]*(?P<comment>{markers}))', re.MULTILINE)
+        
+        alternatives = []
+        first_chars = set()
+        if keywords:
+            alternatives.append(r'\b(?:' + '|'.join(keywords) + r')\b')
+            first_chars.update(keyword[0] for keyword in keywords)
+        if bounded_operators:
+            alternatives.append(r'(?<=\w)(?:' + '|'.join(re.escape(op) for op in bounded_operators) + r')(?=\w)')
+            first_chars.update(op[0] for op in bounded_operators)
+        if ternary:
+            alternatives.append(r'\?')
+            first_chars.add('?')
+        prefilter = ''.join(re.escape(char) for char in sorted(first_chars))
+        self.decision_re = re.compile(rf'(?=[{prefilter}])(?:' + '|'.join(alternatives) + ')')
+        
+        self.method_re = re.compile(method_pattern, re.MULTILINE)
+    
+    def analyze(self, code: str) -> Dict:
+        total_lines = code.count('\n') + 1
+        
+        blank_lines = 0
+        comment_lines = 0
+        for match in self.line_re.finditer(code):
+            if match.lastgroup == 'blank':
+                blank_lines += 1
+            else:
+                comment_lines += 1
+        
+        # Lines of code (excluding blanks and comments)
+        loc = total_lines - blank_lines - comment_lines
+        
+        # Comment density (percentage)
+        comment_density = (comment_lines / total_lines * 100) if total_lines > 0 else 0
+        
+        complexity = 1 + len(self.decision_re.findall(code))  # Base complexity + decision points
+        
+        method_count = len(self.method_re.findall(code))
+        avg_method_length = (loc / method_count) if method_count > 0 else loc
+        
+        return {
+            'loc': max(0, loc),
+            'complexity': max(1, complexity),
+            'comment_density': round(comment_density, 2),
+            'avg_method_length': round(avg_method_length, 2)
+        }
+
+
+QUALITY_SCANNERS = {
+    language: CodeQualityScanner(COMMENT_MARKERS[language], points['keywords'],
+                                 points['bounded_operators'], points['ternary'], METHOD_PATTERNS[language])
+    for language, points in DECISION_POINTS.items()
+}
+DEFAULT_QUALITY_SCANNER = CodeQualityScanner(['//'], ['if', 'for', 'while'], [], False, r'^\s*def\s+\w+')
+
+
+def analyze_code_quality(code: str, language: str) -> Optional[Dict]:
+    """Analyze code quality metrics for any supported language.
+    
+    Module-level so it can run in worker processes.
+    
+    Returns language-agnostic metrics:
+    - loc: Lines of code (excluding blanks and comments)
+    - complexity: Estimated cyclomatic complexity
+    - comment_density: Ratio of comment lines to total lines
+    - avg_method_length: Average lines per function/method
+    """
+    try:
+        return QUALITY_SCANNERS.get(language, DEFAULT_QUALITY_SCANNER).analyze(code)
+    except Exception as e:
+        logger.debug(f"Failed to analyze code quality: {e}")
+        return None
+
+
+class QualityAccumulator:
+    """Per-file quality metrics collected in analysis order.
+    
+    Results from worker processes and the quality cache are added in file
+    order, so the aggregates are identical to a serial, uncached run.
+    """
+    
+    def __init__(self):
+        self.loc: List[int] = []
+        self.complexity: List[int] = []
+        self.comment_density: List[float] = []
+        self.avg_method_length: List[float] = []
+        self.languages: Dict[str, int] = {}
+    
+    def add(self, metrics: Optional[Dict], language: str):
+        if not metrics:
+            return
+        self.loc.append(metrics['loc'])
+        self.complexity.append(metrics['complexity'])
+        self.comment_density.append(metrics['comment_density'])
+        self.avg_method_length.append(metrics['avg_method_length'])
+        self.languages[language] = self.languages.get(language, 0) + 1
+    
+    def to_metrics(self) -> Optional[Dict]:
+        """Average the collected metrics, or None if nothing was analyzed."""
+        if not self.loc:
+            return None
+        return {
+            'avg_lines_of_code': round(sum(self.loc) / len(self.loc), 2),
+            'avg_complexity_per_file': round(sum(self.complexity) / len(self.complexity), 2),
+            'avg_comment_density': round(sum(self.comment_density) / len(self.comment_density), 2),
+            'avg_method_length': round(sum(self.avg_method_length) / len(self.avg_method_length), 2),
+            'files_analyzed': len(self.loc),
+            'languages': dict(self.languages)
+        }
+    
+    def complexity_ci95(self, population: int) -> float:
+        """95% confidence half-width of the mean complexity, as a sample of `population` files."""
+        n = len(self.complexity)
+        if n < 2 or n >= population:
+            return 0.0
+        mean = sum(self.complexity) / n
+        variance = sum((c - mean) ** 2 for c in self.complexity) / (n - 1)
+        # Finite population correction: the sample is drawn without replacement
+        return round(1.96 * math.sqrt(variance / n * (population - n) / (population - 1)), 2)
+
+
+class QualityBudget:
+    """Time and byte limits for a full-coverage quality pass."""
+    
+    def __init__(self, time_budget: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.started = time.monotonic()
+        self.deadline = self.started + time_budget if time_budget else None
+        self.max_bytes = max_bytes
+        self.files_visited = 0
+        self.bytes_read = 0
+        self.stopped_by: Optional[str] = None
+    
+    def exhausted(self) -> bool:
+        if self.stopped_by is None:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stopped_by = 'time_budget'
+            elif self.max_bytes is not None and self.bytes_read >= self.max_bytes:
+                self.stopped_by = 'max_bytes'
+        return self.stopped_by is not None
+    
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class PathProfile:
+    """Include/exclude path globs, applied by git itself as pathspecs.
+    
+    Patterns are git `:(glob)` pathspecs relative to the repository root,
+    e.g. `src/**`, `**/node_modules/**` or `**/*.lock`. With
+    `exclude_generated`, paths marked `linguist-generated` in .gitattributes
+    are excluded as well (git reads the attributes from the working tree).
+    Profile files are JSON:
+        
+        {"include": ["src/**"], "exclude": ["**/fixtures/**"], "exclude_generated": true}
+    """
+    
+    def __init__(self, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 exclude_generated: bool = False):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.exclude_generated = exclude_generated
+    
+    @classmethod
+    def load(cls, spec: str) -> 'PathProfile':
+        """Profile from a JSON file, or the built-in 'vendored' profile."""
+        if spec == 'vendored' and not Path(spec).exists():
+            data = VENDORED_PATH_PROFILE
+        else:
+            with open(spec, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object with include/exclude/exclude_generated")
+        return cls(data.get('include'), data.get('exclude'), data.get('exclude_generated', False))
+    
+    def pathspecs(self) -> List[str]:
+        """Pathspecs for `git log`/`git diff-tree`, to go after `--`.
+        
+        Exclude-only lists are fine: git then starts from every path.
+        """
+        pathspecs = [f':(glob){pattern}' for pattern in self.include]
+        pathspecs += [f':(exclude,glob){pattern}' for pattern in self.exclude]
+        if self.exclude_generated:
+            # `linguist-generated` and `linguist-generated=true` are distinct to attr magic
+            pathspecs += [':(exclude,attr:linguist-generated)', ':(exclude,attr:linguist-generated=true)']
+        return pathspecs
+
+
+def source_language(file_path: str) -> Optional[str]:
+    """Language of a source file, or None for unsupported or excluded paths."""
+    for lang, extensions in LANGUAGE_EXTENSIONS.items():
+        if any(file_path.endswith(ext) for ext in extensions):
+            if any(part in file_path for part in EXCLUDED_PATH_PARTS):
+                return None
+            return lang
+    return None
+
+
+def _file_quality(code: Optional[str], language: str) -> Optional[Dict]:
+    """Metrics for one file, or None for blank/unanalyzed (None) content."""
+    if code is None or not code.strip():
+        return None
+    return analyze_code_quality(code, language)
+
+
+def radon_file_metrics(code: str) -> Optional[Dict]:
+    """Radon Halstead, MI and cyclomatic complexity of Python code, from one parse.
+    
+    `h_visit`, `mi_visit` and `cc_visit` each parse the source again, and
+    `mi_visit` repeats the Halstead visit. Here a single AST feeds one
+    Halstead and one complexity visit, and the raw line counts supply the
+    remaining MI inputs; the results are the same. Radon versions without
+    the AST-level API use the three calls. None for blank or unparsable code.
+    """
+    if not RADON_AVAILABLE or not code.strip():
+        return None
+    
+    try:
+        if RADON_AST_API:
+            tree = ast.parse(code)
+            halstead = h_visit_ast(tree).total
+            complexity = ComplexityVisitor.from_ast(tree)
+            blocks = complexity.blocks
+            raw = radon_raw_analyze(code)
+            # As mi_visit(code, multi=True): multi-line strings count as comments
+            comments = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc != 0 else 0
+            mi = mi_compute(halstead.volume, complexity.total_complexity, raw.lloc, comments)
+        else:
+            halstead = h_visit(code).total
+            mi = mi_visit(code, multi=True)
+            blocks = cc_visit(code)
+    except Exception as e:
+        logger.debug(f"Failed to calculate radon metrics: {e}")
+        return None
+    
+    avg_complexity = sum(block.complexity for block in blocks) / len(blocks) if blocks else 0
+    return {
+        'maintainability_index': mi if isinstance(mi, (int, float)) else (mi.mi if hasattr(mi, 'mi') else 0),
+        'halstead_volume': halstead.volume if halstead else 0,
+        'halstead_difficulty': halstead.difficulty if halstead else 0,
+        'halstead_effort': halstead.effort if halstead else 0,
+        'avg_cyclomatic_complexity': round(avg_complexity, 2),
+        'total_functions': len(blocks)
+    }
+
+
+def _file_radon_metrics(code: Optional[str], language: str) -> Optional[Dict]:
+    """Radon metrics for one Python file, or None for unanalyzed (None) content."""
+    if code is None:
+        return None
+    return radon_file_metrics(code)
+
+
+# Per-file analyzers by quality cache kind: (cache version, function of code and language)
+FILE_ANALYZERS = {
+    'quality': (QUALITY_ANALYZER_VERSION, _file_quality),
+    'halstead': (RADON_METRICS_VERSION, _file_radon_metrics)
+}
+
+
+def _analyze_quality_chunk(sources: List[Tuple[Optional[str], str]], kind: str = 'quality') -> List[Optional[Dict]]:
+    """Process-pool worker: per-file metrics for a chunk of (code, language) pairs."""
+    analyze = FILE_ANALYZERS[kind][1]
+    return [analyze(code, language) for code, language in sources]
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def default_quality_cache_path() -> Path:
+    """Shared per-user location of the quality cache ($XDG_CACHE_HOME/olaf)."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'olaf' / QUALITY_CACHE_FILE
+
+
+class QualityCache:
+    """Persistent per-file metrics keyed by git blob id.
+    
+    A blob id names the exact file content, so metrics computed once stay
+    valid for every commit, branch and repository containing that blob
+    (unchanged files between quarters, vendored copies). Entries are also
+    keyed by kind, language and analyzer version, so a change to the metric
+    code only has to bump its version. Least recently used entries are
+    evicted once the cache holds more than `max_entries`.
+    """
+    
+    def __init__(self, db_path: Path, max_entries: int = QUALITY_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Several analyzer processes may share the cache
+        self.conn = sqlite3.connect(str(db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS metrics (
+                kind TEXT NOT NULL,
+                oid TEXT NOT NULL,
+                language TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                metrics TEXT,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (kind, oid, language, version)
+            );
+            CREATE INDEX IF NOT EXISTS metrics_last_used ON metrics (last_used);
+        """)
+    
+    def get_many(self, kind: str, version: int,
+                 keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Dict]]:
+        """Look up (oid, language) keys; returns the cached ones.
+        
+        A cached value may be None (the file had nothing to analyze).
+        """
+        wanted = set(keys)
+        found = {}
+        for batch in _chunked(sorted({oid for oid, _ in wanted}), 500):
+            rows = self.conn.execute(
+                f"SELECT oid, language, metrics FROM metrics WHERE kind = ? AND version = ? "
+                f"AND oid IN ({','.join('?' * len(batch))})",
+                [kind, version] + batch)
+            for oid, language, metrics in rows:
+                if (oid, language) in wanted:
+                    found[(oid, language)] = json.loads(metrics) if metrics is not None else None
+        if found:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE metrics SET last_used = ? WHERE kind = ? AND oid = ? AND language = ? AND version = ?",
+                    [(time.time(), kind, oid, language, version) for oid, language in found])
+        return found
+    
+    def put_many(self, kind: str, version: int, entries: Iterable[Tuple[str, str, Optional[Dict]]]) -> int:
+        """Store (oid, language, metrics) entries, then evict beyond max_entries.
+        
+        Returns the number of evicted entries.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?)",
+                [(kind, oid, language, version,
+                  json.dumps(metrics, separators=(',', ':')) if metrics is not None else None, now)
+                 for oid, language, metrics in entries])
+        return self.evict()
+    
+    def evict(self) -> int:
+        """Drop least recently used entries beyond max_entries."""
+        count = self.conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM metrics WHERE rowid IN (SELECT rowid FROM metrics ORDER BY last_used LIMIT ?)",
+                (excess,))
+        logger.info(f"Evicted {excess} least recently used entries from quality cache {self.db_path}")
+        return excess
+
+
+def peak_rss_mb() -> Optional[Tuple[float, float]]:
+    """Peak resident set size of this process and of its reaped children, in MB."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1),
+            round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1))
+
+
+class PhaseProfiler:
+    """Per-phase wall/CPU timers and git I/O counters, exported as a Chrome trace.
+    
+    `phase(name)` blocks nest; each becomes a complete ("X") trace event whose
+    args hold the phase's CPU time (this process, and reaped children such as
+    git), git processes started, bytes read from git, time spent waiting on
+    git output and peak RSS so far. The trace opens in chrome://tracing or
+    Perfetto. With `cprofile_dir`, every outermost profiled phase also gets
+    a cProfile dump (`<n>-<phase>.prof`) there.
+    """
+    
+    COUNTERS = ('git_processes', 'git_bytes', 'git_wait_seconds')
+    
+    def __init__(self, cprofile_dir: Optional[Path] = None):
+        self.cprofile_dir = cprofile_dir
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.events: List[Dict] = []
+        self.origin = time.perf_counter()
+        self.cpu_origin = time.process_time()
+        self.times_origin = os.times()
+        self.cprofile_active = False
+        self.dumps = 0
+    
+    def count_git(self, processes: int = 0, nbytes: int = 0, wait_seconds: float = 0.0):
+        self.counters['git_processes'] += processes
+        self.counters['git_bytes'] += nbytes
+        self.counters['git_wait_seconds'] += wait_seconds
+    
+    @contextlib.contextmanager
+    def phase(self, name: str, cprofile: bool = True, **args):
+        """Time a block; yields its args dict, for the block to add details to."""
+        counters = dict(self.counters)
+        profile = None
+        if cprofile and self.cprofile_dir is not None and not self.cprofile_active:
+            profile = cProfile.Profile()
+            self.cprofile_active = True
+            profile.enable()
+        children = os.times()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            if profile is not None:
+                profile.disable()
+                self.cprofile_active = False
+                self.dumps += 1
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(str(self.cprofile_dir / f"{self.dumps:03d}-{name}.prof"))
+            self.events.append(self._event(name, start, end, cpu_start, children, counters, args))
+    
+    def _event(self, name: str, start: float, end: float, cpu_start: float, children: os.times_result,
+               counters: Dict, args: Dict) -> Dict:
+        now = os.times()
+        args = dict(args)
+        args['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+        args['children_cpu_seconds'] = round(max(0.0, now.children_user + now.children_system
+                                                 - children.children_user - children.children_system), 4)
+        for key in self.COUNTERS:
+            args[key] = round(self.counters[key] - counters[key], 4)
+        rss = peak_rss_mb()
+        if rss:
+            args['peak_rss_mb'], args['children_peak_rss_mb'] = rss
+        return {'name': name, 'cat': 'phase', 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                'ts': round((start - self.origin) * 1e6), 'dur': round((end - start) * 1e6), 'args': args}
+    
+    def trace(self, label: str) -> Dict:
+        """Chrome trace-event JSON; a `label` event spans the whole run with its totals."""
+        root = self._event(label, self.origin, time.perf_counter(), self.cpu_origin,
+                           self.times_origin, dict.fromkeys(self.COUNTERS, 0), {})
+        events = sorted(self.events + [root], key=lambda event: (event['ts'], -event['dur']))
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'totals': root['args']}}
+    
+    def write(self, path: Path, label: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(label), f, indent=1)
+
+
+class CommitCache:
+    """On-disk store of parsed commit records keyed by commit hash.
+    
+    Commit hashes are immutable, so a record never needs recomputing. For each
+    scope ('all' branches or 'HEAD') the cache remembers which commits were
+    reachable and the tips they were read from, so later runs only ask git
+    for commits reachable from new tips (excluding `^<known tip>`).
+    """
+    
+    SCHEMA_VERSION = 1
+    
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS commits (
+                hash TEXT PRIMARY KEY,
+                committer_timestamp INTEGER NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS scope_commits (
+                scope TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                committer_timestamp INTEGER NOT NULL,
+                PRIMARY KEY (scope, hash)
+            );
+            CREATE INDEX IF NOT EXISTS scope_commits_time ON scope_commits (scope, committer_timestamp);
+            CREATE TABLE IF NOT EXISTS scope_tips (
+                scope TEXT NOT NULL,
+                tip TEXT NOT NULL,
+                PRIMARY KEY (scope, tip)
+            );
+        """)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != self.SCHEMA_VERSION:
+            if row is not None:
+                logger.info(f"Commit cache schema changed, discarding {db_path}")
+            with self.conn:
+                self.conn.execute("DELETE FROM commits")
+                self.conn.execute("DELETE FROM scope_commits")
+                self.conn.execute("DELETE FROM scope_tips")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                                  (str(self.SCHEMA_VERSION),))
+    
+    def known_tips(self, scope: str) -> List[str]:
+        """Tips whose full history is already cached for a scope."""
+        rows = self.conn.execute("SELECT tip FROM scope_tips WHERE scope = ? ORDER BY tip", (scope,))
+        return [row[0] for row in rows]
+    
+    def clear_scope(self, scope: str):
+        """Forget which commits and tips belong to a scope."""
+        with self.conn:
+            self.conn.execute("DELETE FROM scope_commits WHERE scope = ?", (scope,))
+            self.conn.execute("DELETE FROM scope_tips WHERE scope = ?", (scope,))
+    
+    def add_commits(self, scope: str, tips: List[str], commits: Iterable[CommitRecord],
+                    batch_size: int = 1000) -> int:
+        """Store commits for a scope and record the tips they were read from.
+        
+        Everything happens in one transaction, so an interrupted run leaves the
+        previous tips (and therefore a consistent cache) in place.
+        """
+        row = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM scope_commits WHERE scope = ?",
+                                (scope,)).fetchone()
+        seq = row[0]
+        added = 0
+        with self.conn:
+            batch = []
+            for commit in commits:
+                seq += 1
+                batch.append((commit['hash'], commit['committer_timestamp'],
+                              json.dumps(commit.to_dict(), ensure_ascii=False, separators=(',', ':')), seq))
+                if len(batch) >= batch_size:
+                    added += self._insert_batch(scope, batch)
+                    batch = []
+            if batch:
+                added += self._insert_batch(scope, batch)
+            
+            self.conn.execute("DELETE FROM scope_tips WHERE scope = ?", (scope,))
+            self.conn.executemany("INSERT INTO scope_tips VALUES (?, ?)", [(scope, tip) for tip in tips])
+        return added
+    
+    def _insert_batch(self, scope: str, batch: List[Tuple]) -> int:
+        self.conn.executemany("INSERT OR IGNORE INTO commits VALUES (?, ?, ?)",
+                              [(h, ts, record) for h, ts, record, _ in batch])
+        self.conn.executemany("INSERT OR IGNORE INTO scope_commits VALUES (?, ?, ?, ?)",
+                              [(scope, h, seq, ts) for h, ts, _, seq in batch])
+        return len(batch)
+    
+    def iter_range(self, scope: str, start_ts: float, end_ts: float) -> Iterator[CommitRecord]:
+        """Yield cached commits whose commit time lies in [start_ts, end_ts].
+        
+        Ordered by committer timestamp, newest first. This is git log's order
+        only while committer dates never go backwards along history;
+        CommitColumns does not depend on the order.
+        """
+        rows = self.conn.execute("""
+            SELECT c.record FROM scope_commits s JOIN commits c ON c.hash = s.hash
+            WHERE s.scope = ? AND s.committer_timestamp >= ? AND s.committer_timestamp <= ?
+            ORDER BY s.committer_timestamp DESC, s.seq ASC
+        """, (scope, start_ts, end_ts))
+        for (record,) in rows:
+            yield CommitRecord.from_dict(json.loads(record))
+
+
+def dump_snapshot(snapshot: Dict) -> Tuple[str, Optional[Tuple[int, int]]]:
+    """Serialize a snapshot; also return the byte span of its contributors array.
+    
+    The span is found by serializing once more with a placeholder in place of
+    the array: everything before and after it is byte-identical.
+    """
+    text = json.dumps(snapshot, indent=2, ensure_ascii=False)
+    try:
+        analysis = snapshot['analysis']
+        contributor_metrics = analysis['contributor_metrics']
+        contributor_metrics['contributors']
+    except KeyError:
+        return text, None
+    
+    placeholder = '\0contributors\0'
+    stub = dict(snapshot, analysis=dict(analysis, contributor_metrics=dict(contributor_metrics, contributors=placeholder)))
+    prefix, found, suffix = json.dumps(stub, indent=2, ensure_ascii=False).partition(json.dumps(placeholder))
+    if not found or not text.startswith(prefix) or not text.endswith(suffix):
+        return text, None
+    offset = len(prefix.encode('utf-8'))
+    length = len(text.encode('utf-8')) - offset - len(suffix.encode('utf-8'))
+    return text, (offset, length)
+
+
+class SnapshotIndex:
+    """Headline data of every snapshot file, kept in snapshots-index.json.
+    
+    An entry holds a snapshot's metadata and analysis without the (large)
+    contributors array, the per-contributor totals (CONTRIBUTOR_TOTAL_KEYS)
+    that trend reports and rollups aggregate, and the byte span of the array
+    in the snapshot file, so reports need not open snapshots at all and
+    drill-downs read only the slice they need. Entries are checked against the file's size and
+    mtime; missing or stale ones are rebuilt from a full load.
+    """
+    
+    def __init__(self, snapshots_dir: Path):
+        self.snapshots_dir = snapshots_dir
+        self.path = snapshots_dir / SNAPSHOT_INDEX_FILE
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get('version') == SNAPSHOT_INDEX_VERSION:
+                    self.entries = index['snapshots']
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Rebuilding unreadable snapshot index {self.path}: {e}")
+    
+    def record(self, snapshot_file: Path, snapshot: Dict, contributors_span: Optional[Tuple[int, int]]):
+        """Index a snapshot that was just written (or fully loaded)."""
+        stat = snapshot_file.stat()
+        analysis = dict(snapshot['analysis'])
+        contributors = analysis.get('contributor_metrics', {}).get('contributors', [])
+        if 'contributor_metrics' in analysis:
+            analysis['contributor_metrics'] = {k: v for k, v in analysis['contributor_metrics'].items()
+                                               if k != 'contributors'}
+        self.entries[snapshot_file.name] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'metadata': snapshot['metadata'],
+            'analysis': analysis,
+            'raw_commit_count': snapshot.get('raw_commit_count'),
+            'contributor_totals': [[c[key] for key in CONTRIBUTOR_TOTAL_KEYS] for c in contributors],
+            'contributors_span': list(contributors_span) if contributors_span else None
+        }
+        self.dirty = True
+    
+    def entry(self, snapshot_file: Path) -> Dict:
+        """Indexed data of a snapshot file, refreshed first if stale."""
+        entry = self.entries.get(snapshot_file.name)
+        stat = snapshot_file.stat()
+        if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            with open(snapshot_file, 'rb') as f:
+                raw = f.read()
+            snapshot = json.loads(raw)
+            text, span = dump_snapshot(snapshot)
+            # Offsets are only trusted for files written exactly as dump_snapshot would
+            self.record(snapshot_file, snapshot, span if text.encode('utf-8') == raw else None)
+            entry = self.entries[snapshot_file.name]
+        return entry
+    
+    def all_entries(self) -> List[Tuple[Path, Dict]]:
+        """(file, entry) for every snapshot-*.json, in file name order."""
+        snapshot_files = sorted(self.snapshots_dir.glob('snapshot-*.json'))
+        names = {snapshot_file.name for snapshot_file in snapshot_files}
+        for name in [name for name in self.entries if name not in names]:
+            del self.entries[name]
+            self.dirty = True
+        return [(snapshot_file, self.entry(snapshot_file)) for snapshot_file in snapshot_files]
+    
+    def contributor_totals(self, snapshot_file: Path) -> List[Dict]:
+        """Per-contributor totals of a snapshot, served from the index alone."""
+        return [dict(zip(CONTRIBUTOR_TOTAL_KEYS, row)) for row in self.entry(snapshot_file)['contributor_totals']]
+    
+    def contributors(self, snapshot_file: Path) -> List[Dict]:
+        """The contributors array of a snapshot, reading only its byte span when known."""
+        span = self.entry(snapshot_file)['contributors_span']
+        if span is None:
+            with open(snapshot_file, 'r', encoding='utf-8') as f:
+                return json.load(f)['analysis'].get('contributor_metrics', {}).get('contributors', [])
+        offset, length = span
+        with open(snapshot_file, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+    
+    def save(self):
+        """Write the index if anything changed."""
+        if not self.dirty:
+            return
+        tmp_file = self.path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': SNAPSHOT_INDEX_VERSION, 'snapshots': self.entries}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        tmp_file.replace(self.path)
+        self.dirty = False
+
 
 class GitProductivityAnalyzer:
     """Analyzes Git repository productivity metrics from commit history."""
     
-    def __init__(self, repo_path: str = "."):
+    def __init__(self, repo_path: str = ".", use_commit_cache: bool = False, workers: int = 1,
+                 quality_cache: Optional[Path] = None,
+                 quality_cache_max_entries: int = QUALITY_CACHE_MAX_ENTRIES,
+                 incremental_quality: bool = False, full_coverage: bool = False,
+                 time_budget: Optional[float] = None, max_bytes: Optional[int] = None,
+                 snapshots_dir: Optional[Path] = None, resolve_identities: bool = False,
+                 alias_file: Optional[str] = None, rename_aware: bool = False,
+                 path_profile: Optional[PathProfile] = None, profile: bool = False,
+                 cprofile: bool = False, radon_metrics: bool = False):
         self.repo_path = Path(repo_path).resolve()
-        self.snapshots_dir = self.repo_path / "olaf-data" / "git-snapshots"
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.rename_aware = rename_aware
+        # Git pathspecs of the path profile; excluded paths never leave git
+        self.pathspecs = path_profile.pathspecs() if path_profile else []
+        self.incremental_quality = incremental_quality
+        self.radon_metrics = radon_metrics
+        self.full_coverage = full_coverage or bool(time_budget) or bool(max_bytes)
+        self.time_budget = time_budget
+        self.max_bytes = max_bytes
+        if self.incremental_quality and self.full_coverage:
+            logger.warning("Incremental quality analysis ignores full coverage, time budget and max bytes settings")
+        self.snapshots_dir = Path(snapshots_dir) if snapshots_dir else self.repo_path / "olaf-data" / "git-snapshots"
         self.snapshots_dir.mkdir(parents=True, exist_ok=True)
         
         # Verify it's a git repo
         if not (self.repo_path / ".git").exists():
             raise ValueError(f"Not a git repository: {self.repo_path}")
+        
+        self.commit_cache = CommitCache(self.snapshots_dir / COMMIT_CACHE_FILE) if use_commit_cache else None
+        self.snapshot_index = SnapshotIndex(self.snapshots_dir)
+        # Canonical author identities (.mailmap + aliases); raw emails otherwise
+        self.identity_resolver = (IdentityResolver(self.repo_path, alias_file)
+                                  if resolve_identities or alias_file else None)
+        self.quality_cache = (QualityCache(Path(quality_cache), quality_cache_max_entries)
+                              if quality_cache else None)
+        # Phase timings and git I/O for --profile, written next to the snapshots
+        self.profile_stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.profiler = None
+        if profile or cprofile:
+            self.profiler = PhaseProfiler(self.snapshots_dir / f"cprofile-{self.profile_stamp}" if cprofile else None)
+    
+    def _phase(self, name: str, cprofile: bool = True, **args):
+        """Profiler phase (yielding its args dict); a no-op unless profiling."""
+        if self.profiler is None:
+            return contextlib.nullcontext(args)
+        return self.profiler.phase(name, cprofile, **args)
+    
+    def write_profile(self, label: str) -> Optional[Path]:
+        """Write the Chrome trace of this run next to the snapshots."""
+        if self.profiler is None:
+            return None
+        trace_file = self.snapshots_dir / f"trace-{self.profile_stamp}-{label}.json"
+        self.profiler.write(trace_file, label)
+        return trace_file
     
     def _run_git(self, args: List[str]) -> str:
         """Run git command and return output."""
         cmd = ['git'] + args
         try:
+            started = time.perf_counter()
             result = subprocess.run(
                 cmd, 
                 cwd=self.repo_path, 
@@ -87,12 +1455,70 @@ class GitProductivityAnalyzer:
                 encoding='utf-8',
                 errors='replace'
             )
+            if self.profiler is not None:
+                self.profiler.count_git(1, len(result.stdout.encode('utf-8')), time.perf_counter() - started)
             return result.stdout.strip()
         except subprocess.CalledProcessError as e:
             logger.error(f"Git command failed: {' '.join(cmd)}")
             logger.error(f"Error: {e.stderr}")
             raise
     
+    def _stream_git(self, args: List[str], sep: bytes = b'\0',
+                    chunk_size: int = 1 << 16, input: Optional[bytes] = None) -> Iterator[str]:
+        """Run git command and yield its output record by record.
+        
+        Stdout is read incrementally and split on `sep`, so memory use does
+        not depend on the size of the output. `input` is written to stdin
+        (e.g. revisions for `--stdin`) before reading starts.
+        """
+        cmd = ['git'] + args
+        # stderr goes to a temp file so a chatty git cannot block on a full pipe
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(
+                cmd,
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr
+            )
+            completed = False
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.count_git(processes=1)
+            try:
+                if input is not None:
+                    proc.stdin.write(input)
+                    proc.stdin.close()
+                pending = b''
+                while True:
+                    if profiler is not None:
+                        started = time.perf_counter()
+                        chunk = proc.stdout.read1(chunk_size)
+                        profiler.count_git(nbytes=len(chunk), wait_seconds=time.perf_counter() - started)
+                    else:
+                        chunk = proc.stdout.read1(chunk_size)
+                    if not chunk:
+                        break
+                    pending += chunk
+                    *records, pending = pending.split(sep)
+                    for record in records:
+                        yield record.decode('utf-8', errors='replace')
+                if pending:
+                    yield pending.decode('utf-8', errors='replace')
+                completed = True
+            finally:
+                if not completed:
+                    proc.kill()
+                proc.stdout.close()
+                returncode = proc.wait()
+            
+            if returncode != 0:
+                stderr.seek(0)
+                error = stderr.read().decode('utf-8', errors='replace')
+                logger.error(f"Git command failed: {' '.join(cmd)}")
+                logger.error(f"Error: {error}")
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=error)
+    
     def get_quarter_dates(self, quarter_str: str) -> Tuple[datetime, datetime]:
         """Convert 'YYYY-QN' to start/end dates."""
         match = re.match(r'(\d{4})-Q([1-4])', quarter_str)
@@ -136,17 +1562,36 @@ class GitProductivityAnalyzer:
         return list(dict.fromkeys(quarters))  # Remove duplicates, preserve order
     
     def get_commits_in_range(self, start_date: datetime, end_date: datetime, 
-                            all_branches: bool = True) -> List[Dict]:
+                            all_branches: bool = True) -> List[CommitRecord]:
         """Get all commits in date range with detailed stats."""
-        # Format: %H|%an|%ae|%at|%s
-        # Hash|Author Name|Author Email|Timestamp|Subject
-        format_str = '%H|%an|%ae|%at|%s'
+        return list(self.iter_commits_in_range(start_date, end_date, all_branches))
+    
+    def iter_commits_in_range(self, start_date: datetime, end_date: datetime,
+                              all_branches: bool = True) -> Iterator[CommitRecord]:
+        """Stream commits in date range with detailed stats, one at a time.
+        
+        Uses NUL-delimited `git log -z` output so that separators inside
+        author names or subjects cannot corrupt parsing. With the commit cache
+        enabled, git is only asked for commits not already cached and the
+        range is served from the cache.
+        """
+        if self.commit_cache is not None:
+            scope = 'all' if all_branches else 'HEAD'
+            # Rename-aware or path-filtered records differ from plain ones: cache them separately
+            if self.rename_aware:
+                scope += ':renames'
+            if self.pathspecs:
+                scope += ':paths-' + hashlib.sha1('\0'.join(self.pathspecs).encode('utf-8')).hexdigest()[:12]
+            self._sync_commit_cache(scope)
+            yield from self.commit_cache.iter_range(scope, start_date.timestamp(), end_date.timestamp())
+            return
         
         args = [
             'log',
+            '-z',
             f'--since={start_date.isoformat()}',
             f'--until={end_date.isoformat()}',
-            f'--format={format_str}',
+            f'--format={LOG_FORMAT}',
             '--numstat',
             '--no-merges'
         ]
@@ -154,66 +1599,151 @@ class GitProductivityAnalyzer:
         if all_branches:
             args.append('--all')
         
-        output = self._run_git(args)
+        yield from self._log_commits(args)
+    
+    def _log_commits(self, args: List[str], input: Optional[bytes] = None) -> Iterator[CommitRecord]:
+        """Run a `git log -z --numstat` command and parse its commits.
+        
+        With a path profile, commits touching only excluded paths are not
+        listed at all; `--full-history` keeps side-branch commits that default
+        history simplification would drop.
+        """
+        if self.rename_aware:
+            args = args + RENAME_LOG_OPTIONS
+        if self.pathspecs:
+            args = args + ['--full-history', '--'] + self.pathspecs
+        if not self.rename_aware:
+            yield from self._parse_log_records(self._stream_git(args, input=input))
+            return
         
-        commits = []
+        with GitObjectSizes(self.repo_path) as sizes:
+            yield from self._parse_log_records(self._stream_git(args, input=input), sizes)
+        if self.profiler is not None:
+            self.profiler.count_git(1, sizes.bytes_read)
+    
+    def _sync_commit_cache(self, scope: str):
+        """Add commits reachable from the current tips but not from cached tips."""
+        with self._phase('sync_commit_cache', scope=scope):
+            self._update_commit_cache(scope)
+    
+    def _update_commit_cache(self, scope: str):
+        if scope.startswith('all'):
+            tip_output = self._run_git(['rev-parse', '--all', 'HEAD'])
+        else:
+            tip_output = self._run_git(['rev-parse', 'HEAD'])
+        tips = sorted(set(line.strip() for line in tip_output.split('\n') if line.strip()))
+        known_tips = self.commit_cache.known_tips(scope)
+        
+        if set(tips) == set(known_tips):
+            logger.info(f"Commit cache up to date ({scope}, {len(tips)} tips)")
+            return
+        
+        if known_tips and not self._history_retained(known_tips, tips):
+            # A branch was deleted or force-pushed: cached commits may no longer be reachable
+            logger.warning(f"Cached history was rewritten, rebuilding commit cache ({scope})")
+            self.commit_cache.clear_scope(scope)
+            known_tips = []
+        
+        args = ['log', '-z', f'--format={LOG_FORMAT}', '--numstat', '--no-merges', '--stdin']
+        # `^<tip>` rather than `--not`: older gits reject options in --stdin mode
+        revisions = '\n'.join(tips + [f'^{tip}' for tip in known_tips]) + '\n'
+        added = self.commit_cache.add_commits(
+            scope, tips,
+            self._log_commits(args, input=revisions.encode('utf-8'))
+        )
+        
+        logger.info(f"Commit cache updated ({scope}): {added} new commits")
+    
+    def _history_retained(self, old_tips: List[str], new_tips: List[str]) -> bool:
+        """Check that every commit reachable from old_tips is still reachable from new_tips."""
+        current = set(new_tips)
+        dropped = [tip for tip in old_tips if tip not in current]
+        if not dropped:
+            return True
+        revisions = '\n'.join(dropped + [f'^{tip}' for tip in new_tips]) + '\n'
+        try:
+            for _ in self._stream_git(['rev-list', '--stdin', '-n', '1'], sep=b'\n',
+                                      input=revisions.encode('utf-8')):
+                return False
+        except subprocess.CalledProcessError:
+            # Old tips were garbage-collected
+            return False
+        return True
+    
+    def _parse_log_records(self, records: Iterator[str],
+                           sizes: Optional[GitObjectSizes] = None) -> Iterator[CommitRecord]:
+        """Turn NUL-separated `git log -z --numstat` records into CommitRecords.
+        
+        With `--raw` (rename-aware mode) each commit's raw entries precede its
+        numstat entries, one per file pair and in the same order; they supply
+        the status letter of each file and, through `sizes`, the blob size
+        change of binary files.
+        """
         current_commit = None
+        raw_entries = []
         
-        for line in output.split('\n'):
-            if not line.strip():
+        for record in records:
+            record = record.lstrip('\n')
+            if not record:
                 continue
             
-            # Commit header line
-            if '|' in line and len(line.split('|')) == 5:
+            # Commit header: marker+hash, then five more fields
+            if record.startswith(COMMIT_MARKER):
                 if current_commit:
-                    commits.append(current_commit)
+                    yield current_commit
                 
-                parts = line.split('|')
-                current_commit = {
-                    'hash': parts[0],
-                    'author_name': parts[1],
-                    'author_email': parts[2],
-                    'timestamp': int(parts[3]),
-                    'date': datetime.fromtimestamp(int(parts[3])).isoformat(),
-                    'subject': parts[4],
-                    'files_changed': [],
-                    'additions': 0,
-                    'deletions': 0,
-                    'total_churn': 0,
-                    'net_churn': 0,
-                    'file_count': 0
-                }
+                author_name = next(records)
+                author_email = next(records)
+                timestamp = int(next(records))
+                committer_timestamp = int(next(records))
+                subject = next(records)
+                current_commit = CommitRecord(record[len(COMMIT_MARKER):], author_name, author_email,
+                                              timestamp, committer_timestamp, subject)
+                raw_entries = []
+                continue
+            
+            # Raw entry ":<modes> <old oid> <new oid> <status>", then one path (two for renames/copies)
+            if record.startswith(':'):
+                fields = record.split()
+                status = fields[4][0]
+                next(records)
+                if status in 'RC':
+                    next(records)
+                raw_entries.append((fields[2], fields[3], status))
+                continue
+            
+            # File stat record (additions, deletions, filename)
+            if current_commit is None:
+                continue
+            parts = record.split('\t', 2)
+            if len(parts) < 3:
+                continue
+            filename = parts[2]
+            old_filename = None
+            if not filename:
+                # Rename/copy: "adds\tdels\t" followed by old and new path records
+                old_filename = next(records)
+                filename = next(records)
+            try:
+                adds = int(parts[0]) if parts[0] != '-' else 0
+                dels = int(parts[1]) if parts[1] != '-' else 0
+            except ValueError:
+                continue
+            
+            if sizes is None:
+                current_commit.add_file(filename, adds, dels)
+                continue
             
-            # File stat line (additions, deletions, filename)
-            elif current_commit and '\t' in line:
-                parts = line.split('\t')
-                if len(parts) >= 3:
-                    try:
-                        adds = int(parts[0]) if parts[0] != '-' else 0
-                        dels = int(parts[1]) if parts[1] != '-' else 0
-                        filename = parts[2]
-                        
-                        current_commit['files_changed'].append({
-                            'file': filename,
-                            'additions': adds,
-                            'deletions': dels
-                        })
-                        current_commit['additions'] += adds
-                        current_commit['deletions'] += dels
-                    except ValueError:
-                        pass
+            raw = raw_entries[current_commit.file_count] if current_commit.file_count < len(raw_entries) else None
+            status = raw[2] if raw else ('R' if old_filename else 'M')
+            binary_delta = None
+            if parts[0] == '-' and raw:
+                binary_delta = sizes.size(raw[1]) - sizes.size(raw[0])
+            current_commit.add_file(filename, adds, dels, status, old_filename, binary_delta)
         
         # Add last commit
         if current_commit:
-            commits.append(current_commit)
-        
-        # Calculate derived metrics
-        for commit in commits:
-            commit['total_churn'] = commit['additions'] + commit['deletions']
-            commit['net_churn'] = commit['additions'] - commit['deletions']
-            commit['file_count'] = len(commit['files_changed'])
-        
-        return commits
+            yield current_commit
     
     def calculate_halstead_metrics(self, file_path: Path) -> Optional[Dict]:
         """Calculate Halstead metrics for Python files using radon."""
@@ -226,73 +1756,67 @@ class GitProductivityAnalyzer:
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 code = f.read()
-            
-            if not code.strip():
-                return None
-            
-            # Halstead metrics
-            h_metrics = h_visit(code)
-            
-            # Maintainability Index
-            mi = mi_visit(code, multi=True)
-            
-            # Cyclomatic Complexity
-            cc_results = cc_visit(code)
-            avg_complexity = sum(item.complexity for item in cc_results) / len(cc_results) if cc_results else 0
-            
-            return {
-                'maintainability_index': mi if isinstance(mi, (int, float)) else (mi.mi if hasattr(mi, 'mi') else 0),
-                'halstead_volume': h_metrics.total.volume if h_metrics and h_metrics.total else 0,
-                'halstead_difficulty': h_metrics.total.difficulty if h_metrics and h_metrics.total else 0,
-                'halstead_effort': h_metrics.total.effort if h_metrics and h_metrics.total else 0,
-                'avg_cyclomatic_complexity': round(avg_complexity, 2),
-                'total_functions': len(cc_results)
-            }
-        except Exception as e:
+        except OSError as e:
             logger.debug(f"Failed to calculate Halstead for {file_path}: {e}")
             return None
+        
+        return radon_file_metrics(code)
+    
+    def calculate_radon_at_commit(self, commit_hash: str) -> Optional[Dict]:
+        """Radon Halstead/MI/CC averages over every Python file at a commit.
+        
+        Each file is parsed once (see `radon_file_metrics`); files are spread
+        over the process pool with --workers and cached by blob id in the
+        quality cache (kind 'halstead'), so a file unchanged between
+        snapshots is analyzed once.
+        """
+        python_files = [file for file in self._list_source_files(commit_hash) if file[1] == 'python']
+        cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+        results = [metrics for _, metrics in self._analyze_files(python_files, commit_hash, cache_stats, kind='halstead')
+                   if metrics]
+        if not results:
+            return None
+        
+        count = len(results)
+        radon = {
+            'files_analyzed': count,
+            'avg_maintainability_index': round(sum(m['maintainability_index'] for m in results) / count, 2),
+            'avg_halstead_volume': round(sum(m['halstead_volume'] for m in results) / count, 2),
+            'avg_halstead_difficulty': round(sum(m['halstead_difficulty'] for m in results) / count, 2),
+            'avg_halstead_effort': round(sum(m['halstead_effort'] for m in results) / count, 2),
+            'avg_cyclomatic_complexity': round(sum(m['avg_cyclomatic_complexity'] for m in results) / count, 2),
+            'total_functions': sum(m['total_functions'] for m in results)
+        }
+        if self.quality_cache is not None:
+            radon['cache'] = cache_stats
+        logger.info(f"Radon metrics calculated for {count} Python files at {commit_hash[:8]}")
+        return radon
     
     def calculate_quality_at_commit(self, commit_hash: str) -> Optional[Dict]:
         """Calculate quality metrics for code at a specific commit.
         
         Supports: Python, Java, C/C++, C#, JavaScript/TypeScript, Go
-        Uses git show to get file contents at that commit without modifying working directory.
+        Reads blobs straight from the object database through a single
+        `git cat-file --batch` process, without modifying the working directory.
+        In incremental mode every source file is covered (see
+        `_calculate_quality_incremental`), in full-coverage mode as many as the
+        budget allows (see `_calculate_quality_full`); otherwise up to 1000
+        are sampled.
         """
         logger.info(f"Calculating quality metrics at commit {commit_hash[:8]}...")
         
         try:
-            # Get list of all source files at this commit
-            file_list = self._run_git(['ls-tree', '-r', '--name-only', commit_hash])
-            all_files = [f.strip() for f in file_list.split('\n') if f.strip()]
-            
-            # Filter for supported languages
-            source_files = []
-            for file_path in all_files:
-                for lang, extensions in LANGUAGE_EXTENSIONS.items():
-                    if any(file_path.endswith(ext) for ext in extensions):
-                        source_files.append((file_path, lang))
-                        break
+            if self.incremental_quality:
+                return self._calculate_quality_incremental(commit_hash)
             
-            # Exclude common non-source paths
-            source_files = [(f, lang) for f, lang in source_files if not any(
-                part in f for part in ['.venv/', 'venv/', 'node_modules/', '__pycache__/', 
-                                      'site-packages/', '.git/', 'target/', 'build/', 'dist/',
-                                      'vendor/', '.gradle/', 'bin/', 'obj/']
-            )]
+            source_files = self._list_source_files(commit_hash)
             
             if not source_files:
                 logger.info(f"No source files found at commit {commit_hash[:8]}")
                 return None
             
-            # Metrics accumulators
-            all_metrics = {
-                'loc': [],
-                'complexity': [],
-                'comment_density': [],
-                'avg_method_length': []
-            }
-            
-            language_stats = defaultdict(int)
+            if self.full_coverage:
+                return self._calculate_quality_full(commit_hash, source_files)
             
             # Analyze up to 1000 files maximum for comprehensive coverage
             analysis_limit = min(1000, len(source_files))
@@ -307,254 +1831,352 @@ class GitProductivityAnalyzer:
             else:
                 sampled_files = source_files
             
-            for file_path, lang in sampled_files:
-                try:
-                    # Get file content at this commit
-                    code = self._run_git(['show', f'{commit_hash}:{file_path}'])
-                    
-                    if not code.strip():
-                        continue
-                    
-                    # Calculate language-agnostic metrics
-                    metrics = self._analyze_code_quality(code, lang)
-                    if metrics:
-                        all_metrics['loc'].append(metrics['loc'])
-                        all_metrics['complexity'].append(metrics['complexity'])
-                        all_metrics['comment_density'].append(metrics['comment_density'])
-                        all_metrics['avg_method_length'].append(metrics['avg_method_length'])
-                        language_stats[lang] += 1
-                
-                except Exception as e:
-                    logger.debug(f"Failed to analyze {file_path} at {commit_hash[:8]}: {e}")
-                    continue
-            
-            if all_metrics['loc']:
-                result = {
-                    'avg_lines_of_code': round(sum(all_metrics['loc']) / len(all_metrics['loc']), 2),
-                    'avg_complexity_per_file': round(sum(all_metrics['complexity']) / len(all_metrics['complexity']), 2),
-                    'avg_comment_density': round(sum(all_metrics['comment_density']) / len(all_metrics['comment_density']), 2),
-                    'avg_method_length': round(sum(all_metrics['avg_method_length']) / len(all_metrics['avg_method_length']), 2),
-                    'files_analyzed': len(all_metrics['loc']),
-                    'languages': dict(language_stats)
-                }
-                logger.info(f"Quality metrics calculated for {len(all_metrics['loc'])} files at {commit_hash[:8]} - Languages: {dict(language_stats)}")
-                return result
+            accumulator = QualityAccumulator()
+            cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+            for (_, lang, _), metrics in self._analyze_files(sampled_files, commit_hash, cache_stats):
+                accumulator.add(metrics, lang)
             
-            return None
+            return self._finish_quality(accumulator.to_metrics(), cache_stats, commit_hash)
         
         except Exception as e:
             logger.error(f"Failed to calculate quality at commit {commit_hash[:8]}: {e}")
             return None
     
-    def _analyze_code_quality(self, code: str, language: str) -> Optional[Dict]:
-        """Analyze code quality metrics for any supported language.
-        
-        Returns language-agnostic metrics:
-        - loc: Lines of code (excluding blanks and comments)
-        - complexity: Estimated cyclomatic complexity
-        - comment_density: Ratio of comment lines to total lines
-        - avg_method_length: Average lines per function/method
+    def _calculate_quality_incremental(self, commit_hash: str) -> Optional[Dict]:
+        """Quality metrics over every source file, updated from the previous snapshot.
+        
+        A per-path table of (oid, language, metrics) for the last analyzed
+        commit is kept in quality-table.json. Only paths that `git diff-tree`
+        reports as added or modified since that commit are analyzed; deleted
+        paths are dropped. Aggregates are recomputed from the whole table in
+        path order, so the result does not depend on the previous commit.
         """
-        try:
-            lines = code.split('\n')
-            total_lines = len(lines)
-            
-            # Count blank lines
-            blank_lines = sum(1 for line in lines if not line.strip())
-            
-            # Count comment lines (language-specific patterns)
-            comment_patterns = {
-                'python': [r'^\s*#', r'^\s*"""', r"^\s*'''"],
-                'java': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-                'c': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-                'cpp': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-                'csharp': [r'^\s*//', r'^\s*/\*', r'^\s*\*', r'^\s*///'],
-                'javascript': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-                'typescript': [r'^\s*//', r'^\s*/\*', r'^\s*\*'],
-                'go': [r'^\s*//', r'^\s*/\*', r'^\s*\*']
-            }
-            
-            patterns = comment_patterns.get(language, [r'^\s*//'])
-            comment_lines = 0
-            for line in lines:
-                if any(re.match(pattern, line) for pattern in patterns):
-                    comment_lines += 1
-            
-            # Lines of code (excluding blanks and comments)
-            loc = total_lines - blank_lines - comment_lines
-            
-            # Comment density (percentage)
-            comment_density = (comment_lines / total_lines * 100) if total_lines > 0 else 0
-            
-            # Estimate cyclomatic complexity by counting decision points
-            complexity_patterns = {
-                'python': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\band\b', r'\bor\b', r'\belif\b', r'\bexcept\b'],
-                'java': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
-                'c': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
-                'cpp': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
-                'csharp': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
-                'javascript': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
-                'typescript': [r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'\bcatch\b', r'\b&&\b', r'\b\|\|\b', r'\?'],
-                'go': [r'\bif\b', r'\bfor\b', r'\bswitch\b', r'\bcase\b', r'\b&&\b', r'\b\|\|\b']
-            }
-            
-            complexity = 1  # Base complexity
-            patterns = complexity_patterns.get(language, [r'\bif\b', r'\bfor\b', r'\bwhile\b'])
-            for pattern in patterns:
-                complexity += len(re.findall(pattern, code))
-            
-            # Count methods/functions to estimate average length
-            method_patterns = {
-                'python': r'^\s*def\s+\w+',
-                'java': r'^\s*(public|private|protected|static|\s)*\s+\w+\s+\w+\s*\(',
-                'c': r'^\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
-                'cpp': r'^\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
-                'csharp': r'^\s*(public|private|protected|static|\s)*\s+\w+\s+\w+\s*\(',
-                'javascript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|\w+\s*:\s*function)',
-                'typescript': r'^\s*(function\s+\w+|const\s+\w+\s*=\s*\([^)]*\)\s*=>|\w+\s*:\s*function)',
-                'go': r'^\s*func\s+\w+'
-            }
-            
-            pattern = method_patterns.get(language, r'^\s*def\s+\w+')
-            method_count = len(re.findall(pattern, code, re.MULTILINE))
-            avg_method_length = (loc / method_count) if method_count > 0 else loc
-            
-            return {
-                'loc': max(0, loc),
-                'complexity': max(1, complexity),
-                'comment_density': round(comment_density, 2),
-                'avg_method_length': round(avg_method_length, 2)
-            }
+        table = self._load_quality_table()
+        base_commit = table['commit'] if table else None
+        changes = None
+        if base_commit and base_commit != commit_hash:
+            changes = self._changed_source_files(base_commit, commit_hash)
+        
+        if base_commit == commit_hash:
+            entries = table['files']
+            to_analyze = []
+        elif changes is not None:
+            entries = table['files']
+            to_analyze, removed = changes
+            for path in removed:
+                entries.pop(path, None)
+            for path, _, _ in to_analyze:
+                entries.pop(path, None)
+        else:
+            entries = {}
+            to_analyze = self._list_source_files(commit_hash)
+            base_commit = None
         
-        except Exception as e:
-            logger.debug(f"Failed to analyze code quality: {e}")
+        logger.info(f"Incremental quality at {commit_hash[:8]}: analyzing {len(to_analyze)} changed files "
+                    f"(base {base_commit[:8] if base_commit else 'none'}, {len(entries)} unchanged)")
+        
+        cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+        for (path, lang, oid), metrics in self._analyze_files(to_analyze, commit_hash, cache_stats):
+            entries[path] = [oid, lang, metrics]
+        
+        self._save_quality_table(commit_hash, entries)
+        
+        if not entries:
+            logger.info(f"No source files found at commit {commit_hash[:8]}")
             return None
+        
+        accumulator = QualityAccumulator()
+        for path in sorted(entries):
+            _, lang, metrics = entries[path]
+            accumulator.add(metrics, lang)
+        
+        result = accumulator.to_metrics()
+        if result:
+            result['incremental'] = {
+                'base_commit': base_commit,
+                'files_reanalyzed': len(to_analyze),
+                'files_tracked': len(entries)
+            }
+        return self._finish_quality(result, cache_stats, commit_hash)
     
-    def analyze_commits(self, commits: List[Dict], calculate_quality: bool = False) -> Dict:
-        """Analyze commit patterns and generate metrics.
+    def _calculate_quality_full(self, commit_hash: str, source_files: List[Tuple[str, str, str]]) -> Optional[Dict]:
+        """Quality metrics over all source files, within the time/byte budget.
         
-        Args:
-            commits: List of commit dictionaries
-            calculate_quality: If True, calculate Halstead/quality metrics for Python files
+        Files are visited in blob id order, which is effectively random, so a
+        pass cut short by --time-budget or --max-bytes still covers an unbiased
+        sample. The coverage block records how far it got and the 95%
+        confidence half-width of avg_complexity_per_file (0 when complete).
         """
-        if not commits:
-            return self._empty_analysis()
-        
-        # Group by contributor
-        by_contributor = defaultdict(list)
-        for commit in commits:
-            by_contributor[commit['author_email']].append(commit)
-        
-        # Group by date
-        by_date = defaultdict(list)
-        for commit in commits:
-            date = datetime.fromtimestamp(commit['timestamp']).date()
-            by_date[date].append(commit)
-        
-        # Calculate metrics
-        total_commits = len(commits)
-        total_additions = sum(c['additions'] for c in commits)
-        total_deletions = sum(c['deletions'] for c in commits)
-        total_churn = sum(c['total_churn'] for c in commits)
-        net_churn = total_additions - total_deletions
+        budget = QualityBudget(self.time_budget, self.max_bytes)
+        total_files = len(source_files)
+        logger.info(f"Analyzing all {total_files} source files at commit {commit_hash[:8]} "
+                    f"(time budget: {self.time_budget or 'none'}s, max bytes: {self.max_bytes or 'none'})...")
+        
+        cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+        by_oid = sorted(source_files, key=lambda file: file[2])
+        analyzed = list(self._analyze_files(by_oid, commit_hash, cache_stats, budget))
+        
+        # Aggregate in tree (path) order, as the other modes do
+        analyzed.sort(key=lambda item: item[0][0])
+        accumulator = QualityAccumulator()
+        for (_, lang, _), metrics in analyzed:
+            accumulator.add(metrics, lang)
+        
+        result = accumulator.to_metrics()
+        if budget.stopped_by:
+            logger.warning(f"Quality analysis stopped by {budget.stopped_by} after "
+                           f"{budget.files_visited}/{total_files} files at {commit_hash[:8]}")
+        if result:
+            result['coverage'] = {
+                'files_total': total_files,
+                'files_visited': budget.files_visited,
+                'coverage_pct': round(budget.files_visited / total_files * 100, 2),
+                'complete': budget.stopped_by is None,
+                'stopped_by': budget.stopped_by,
+                'bytes_read': budget.bytes_read,
+                'elapsed_seconds': round(budget.elapsed(), 2),
+                'avg_complexity_ci95': accumulator.complexity_ci95(total_files) if budget.stopped_by else 0.0
+            }
+        return self._finish_quality(result, cache_stats, commit_hash)
+    
+    def _finish_quality(self, result: Optional[Dict], cache_stats: Dict, commit_hash: str) -> Optional[Dict]:
+        """Attach quality cache statistics and log the outcome."""
+        if self.quality_cache is not None:
+            logger.info(f"Quality cache at {commit_hash[:8]}: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            if result:
+                result['cache'] = cache_stats
+        if result:
+            logger.info(f"Quality metrics calculated for {result['files_analyzed']} files at {commit_hash[:8]} - Languages: {result['languages']}")
+        return result
+    
+    def _list_source_files(self, commit_hash: str) -> List[Tuple[str, str, str]]:
+        """List (path, language, oid) for every source file at a commit, in tree order."""
+        with self._phase('list_source_files', commit=commit_hash) as info:
+            source_files = self._read_source_files(commit_hash)
+            info['files'] = len(source_files)
+        return source_files
+    
+    def _read_source_files(self, commit_hash: str) -> List[Tuple[str, str, str]]:
+        if self.pathspecs:
+            # ls-tree takes no pathspec magic; a diff against the empty tree does
+            changes = self._changed_source_files(EMPTY_TREE_OID, commit_hash)
+            return changes[0] if changes else []
+        
+        source_files = []
+        for entry in self._stream_git(['ls-tree', '-r', '-z', commit_hash]):
+            meta, _, file_path = entry.partition('\t')
+            parts = meta.split()
+            if len(parts) == 3 and parts[1] == 'blob' and file_path:
+                lang = source_language(file_path)
+                if lang:
+                    source_files.append((file_path, lang, parts[2]))
+        return source_files
+    
+    def _changed_source_files(self, base_commit: str, commit_hash: str
+                              ) -> Optional[Tuple[List[Tuple[str, str, str]], List[str]]]:
+        """Source files added/modified and paths removed between two commits.
         
-        # Time-based metrics
-        dates = sorted(by_date.keys())
-        date_range_days = (dates[-1] - dates[0]).days + 1 if dates else 1
-        active_days = len(dates)
+        Uses `git diff-tree --raw` rather than `--name-status` because it also
+        reports the new blob ids. Returns None if the base commit is gone.
+        """
+        args = ['diff-tree', '-r', '-z', '--no-renames', base_commit, commit_hash]
+        if self.pathspecs:
+            args += ['--'] + self.pathspecs
+        records = self._stream_git(args)
+        changed = []
+        removed = []
+        try:
+            for meta in records:
+                file_path = next(records)
+                # ":<old mode> <new mode> <old oid> <new oid> <status>"
+                _, new_mode, _, new_oid, status = meta.lstrip(':').split()
+                lang = source_language(file_path)
+                if not lang:
+                    continue
+                if status == 'D' or new_mode == '160000':
+                    removed.append(file_path)
+                else:
+                    changed.append((file_path, lang, new_oid))
+        except subprocess.CalledProcessError:
+            logger.warning(f"Previous quality snapshot commit {base_commit[:8]} is unavailable, analyzing all files")
+            return None
+        return changed, removed
+    
+    def _load_quality_table(self) -> Optional[Dict]:
+        """Load the per-path quality table, or None if missing or stale."""
+        table_file = self.snapshots_dir / QUALITY_TABLE_FILE
+        if not table_file.exists():
+            return None
+        try:
+            with open(table_file, 'r') as f:
+                table = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable quality table {table_file}: {e}")
+            return None
+        if table.get('analyzer_version') != QUALITY_ANALYZER_VERSION:
+            return None
+        if table.get('pathspecs', []) != self.pathspecs:
+            # Built under another path profile
+            return None
+        return table
+    
+    def _save_quality_table(self, commit_hash: str, entries: Dict[str, List]):
+        table_file = self.snapshots_dir / QUALITY_TABLE_FILE
+        tmp_file = table_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({
+                'analyzer_version': QUALITY_ANALYZER_VERSION,
+                'commit': commit_hash,
+                'pathspecs': self.pathspecs,
+                'files': entries
+            }, f, separators=(',', ':'))
+        tmp_file.replace(table_file)
+    
+    def _analyze_files(self, files: List[Tuple[str, str, str]], commit_hash: str, cache_stats: Dict,
+                       budget: Optional[QualityBudget] = None, kind: str = 'quality'
+                       ) -> Iterator[Tuple[Tuple[str, str, str], Optional[Dict]]]:
+        """Yield (file, metrics) for (path, language, oid) files, in order.
+        
+        `kind` selects the per-file analyzer in FILE_ANALYZERS. Blobs found in
+        the quality cache are neither read nor analyzed; unreadable blobs are
+        skipped, and no new files are started once `budget` is exhausted.
+        Cache hits, misses and evictions are added to `cache_stats` once the
+        generator is exhausted.
+        """
+        version = FILE_ANALYZERS[kind][0]
+        cached = {}
+        if self.quality_cache is not None:
+            cached = self.quality_cache.get_many(kind, version, [(oid, lang) for _, lang, oid in files])
+        
+        fresh = []
+        with GitBlobReader(self.repo_path) as blobs:
+            sources = self._iter_blob_sources(blobs, files, commit_hash, skip=cached, budget=budget)
+            for file, metrics in self._evaluate_quality(sources, kind):
+                _, lang, oid = file
+                if (oid, lang) in cached:
+                    metrics = cached[(oid, lang)]
+                    cache_stats['hits'] += 1
+                else:
+                    fresh.append((oid, lang, metrics))
+                yield file, metrics
+        if self.profiler is not None:
+            self.profiler.count_git(1, blobs.bytes_read)
+        
+        if self.quality_cache is not None:
+            cache_stats['misses'] += len(fresh)
+            cache_stats['evicted'] += self.quality_cache.put_many(kind, version, fresh)
+    
+    def _iter_blob_sources(self, blobs: GitBlobReader, files: List[Tuple[str, str, str]],
+                           commit_hash: str, skip=(), budget: Optional[QualityBudget] = None
+                           ) -> Iterator[Tuple[Tuple[str, str, str], Optional[str]]]:
+        """Yield (file, code) for each readable (path, language, oid) blob.
         
-        # Commit frequency
-        commits_per_day = total_commits / max(date_range_days, 1)
-        commits_per_active_day = total_commits / max(active_days, 1)
-        commits_per_week = commits_per_day * 7
+        Blobs whose (oid, language) is in `skip` are not read; their code is
+        None. Stops early once `budget` is exhausted.
+        """
+        for file in files:
+            if budget is not None:
+                if budget.exhausted():
+                    break
+                budget.files_visited += 1
+            file_path, lang, oid = file
+            if (oid, lang) in skip:
+                yield file, None
+                continue
+            try:
+                data = blobs.read(oid)
+            except Exception as e:
+                logger.debug(f"Failed to read {file_path} at {commit_hash[:8]}: {e}")
+                continue
+            if data is None:
+                continue
+            if budget is not None:
+                budget.bytes_read += len(data)
+            yield file, decode_blob(data)
+    
+    def _evaluate_quality(self, sources: Iterable[Tuple[Tuple[str, str, str], Optional[str]]], kind: str = 'quality'
+                          ) -> Iterator[Tuple[Tuple[str, str, str], Optional[Dict]]]:
+        """Yield (file, metrics) for (file, code) sources, in order.
+        
+        Metrics are None for blank files and for sources without code. With
+        more than one worker, chunks are fanned out to a process pool while
+        blobs are still being read; at most two chunks per worker are in
+        flight, and results are yielded in submission order.
+        """
+        if self.workers <= 1:
+            analyze = FILE_ANALYZERS[kind][1]
+            for file, code in sources:
+                yield file, analyze(code, file[1])
+            return
         
-        # Commit size metrics
-        avg_churn_per_commit = total_churn / total_commits if total_commits else 0
-        avg_files_per_commit = sum(c['file_count'] for c in commits) / total_commits if total_commits else 0
-        avg_additions_per_commit = total_additions / total_commits if total_commits else 0
-        avg_deletions_per_commit = total_deletions / total_commits if total_commits else 0
+        def drain(files, future):
+            yield from zip(files, future.result())
+        
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in _chunked(sources, QUALITY_CHUNK_SIZE):
+                files = [file for file, _ in chunk]
+                future = executor.submit(_analyze_quality_chunk, [(code, file[1]) for file, code in chunk], kind)
+                pending.append((files, future))
+                if len(pending) >= self.workers * 2:
+                    yield from drain(*pending.popleft())
+            while pending:
+                yield from drain(*pending.popleft())
+    
+    def _analyze_code_quality(self, code: str, language: str) -> Optional[Dict]:
+        """Analyze code quality metrics for any supported language (see analyze_code_quality)."""
+        return analyze_code_quality(code, language)
+    
+    def analyze_commits(self, commits: Iterable, calculate_quality: bool = False) -> Dict:
+        """Analyze commit patterns and generate metrics.
         
-        # Rework ratio (deletions/additions - high = lots of rework)
-        rework_ratio = total_deletions / total_additions if total_additions > 0 else 0
+        Commits are consumed in a single pass into a CommitColumns store, so
+        a generator from `iter_commits_in_range` never materializes commit
+        dicts; all metrics are then computed from the columns.
         
-        # Contributor metrics
-        contributor_stats = []
-        for email, contributor_commits in by_contributor.items():
-            name = contributor_commits[0]['author_name']
-            contrib_additions = sum(c['additions'] for c in contributor_commits)
-            contrib_deletions = sum(c['deletions'] for c in contributor_commits)
-            contrib_churn = sum(c['total_churn'] for c in contributor_commits)
-            
-            contributor_stats.append({
-                'email': email,
-                'name': name,
-                'commit_count': len(contributor_commits),
-                'additions': contrib_additions,
-                'deletions': contrib_deletions,
-                'total_churn': contrib_churn,
-                'net_churn': contrib_additions - contrib_deletions,
-                'avg_churn_per_commit': contrib_churn / len(contributor_commits),
-                'commit_percentage': (len(contributor_commits) / total_commits * 100)
-            })
+        Args:
+            commits: Iterable of CommitRecords (or equivalent commit dictionaries)
+            calculate_quality: If True, calculate Halstead/quality metrics for Python files
+        """
+        columns = self._new_columns()
+        with self._phase('read_commits') as info:
+            for commit in commits:
+                columns.add(commit)
+            info['commits'] = columns.total_commits
         
-        # Sort contributors by commit count
-        contributor_stats.sort(key=lambda x: x['commit_count'], reverse=True)
+        return self._analysis_from_columns(columns, calculate_quality)
+    
+    def _new_columns(self) -> CommitColumns:
+        return CommitColumns(self.identity_resolver, self.rename_aware)
+    
+    def _analysis_from_columns(self, columns: CommitColumns, calculate_quality: bool = False) -> Dict:
+        """Build the analysis for collected commits, optionally with quality metrics."""
+        if not columns.total_commits:
+            return self._empty_analysis()
         
-        # Commit size distribution
-        small_commits = len([c for c in commits if c['total_churn'] < 50])
-        medium_commits = len([c for c in commits if 50 <= c['total_churn'] < 200])
-        large_commits = len([c for c in commits if 200 <= c['total_churn'] < 1000])
-        huge_commits = len([c for c in commits if c['total_churn'] >= 1000])
+        with self._phase('aggregate', commits=columns.total_commits):
+            result = columns.to_analysis()
         
         # Calculate quality metrics if requested
-        quality_metrics = None
         if calculate_quality and RADON_AVAILABLE:
-            # Get the last commit hash in the date range to analyze code at that point
-            if commits:
-                last_commit_hash = commits[-1]['hash']
-                quality_metrics = self.calculate_quality_at_commit(last_commit_hash)
-        
-        result = {
-            'commit_metrics': {
-                'total_commits': total_commits,
-                'commits_per_day': round(commits_per_day, 2),
-                'commits_per_active_day': round(commits_per_active_day, 2),
-                'commits_per_week': round(commits_per_week, 2),
-                'active_days': active_days,
-                'total_days_in_range': date_range_days
-            },
-            'churn_metrics': {
-                'total_additions': total_additions,
-                'total_deletions': total_deletions,
-                'total_churn': total_churn,
-                'net_churn': net_churn,
-                'avg_churn_per_commit': round(avg_churn_per_commit, 2),
-                'avg_additions_per_commit': round(avg_additions_per_commit, 2),
-                'avg_deletions_per_commit': round(avg_deletions_per_commit, 2),
-                'avg_files_per_commit': round(avg_files_per_commit, 2),
-                'rework_ratio': round(rework_ratio, 3)
-            },
-            'commit_size_distribution': {
-                'small_commits_under_50': small_commits,
-                'medium_commits_50_200': medium_commits,
-                'large_commits_200_1000': large_commits,
-                'huge_commits_over_1000': huge_commits
-            },
-            'contributor_metrics': {
-                'total_contributors': len(by_contributor),
-                'contributors': contributor_stats,
-                'churn_per_contributor': round(total_churn / len(by_contributor), 2) if by_contributor else 0
-            }
-        }
-        
-        if quality_metrics:
-            result['quality_metrics'] = quality_metrics
+            # Analyze code at the last commit seen in the date range
+            with self._phase('quality', commit=columns.last_hash) as info:
+                quality_metrics = self.calculate_quality_at_commit(columns.last_hash)
+                info['files_analyzed'] = quality_metrics['files_analyzed'] if quality_metrics else 0
+            if quality_metrics and self.radon_metrics:
+                with self._phase('radon', commit=columns.last_hash) as info:
+                    radon = self.calculate_radon_at_commit(columns.last_hash)
+                    info['files_analyzed'] = radon['files_analyzed'] if radon else 0
+                if radon:
+                    quality_metrics['radon'] = radon
+            if quality_metrics:
+                result['quality_metrics'] = quality_metrics
         
         return result
     
     def _empty_analysis(self) -> Dict:
         """Return empty analysis structure."""
-        return {
+        analysis = {
             'commit_metrics': {
                 'total_commits': 0,
                 'commits_per_day': 0,
@@ -586,6 +2208,9 @@ class GitProductivityAnalyzer:
                 'churn_per_contributor': 0
             }
         }
+        if self.rename_aware:
+            analysis['rename_metrics'] = rename_metrics(dict.fromkeys(RENAME_METRIC_KEYS, 0))
+        return analysis
     
     def create_snapshot(self, quarter: str, all_branches: bool = True, include_quality: bool = False) -> str:
         """Create snapshot for a specific quarter.
@@ -602,12 +2227,23 @@ class GitProductivityAnalyzer:
         
         start_date, end_date = self.get_quarter_dates(quarter)
         
-        # Get commits
-        commits = self.get_commits_in_range(start_date, end_date, all_branches)
+        # Stream commits straight into the analysis
+        commits = self.iter_commits_in_range(start_date, end_date, all_branches)
         
         # Analyze
         analysis = self.analyze_commits(commits, calculate_quality=include_quality)
         
+        return self._write_snapshot(quarter, start_date, end_date, all_branches, analysis)
+    
+    def _write_snapshot(self, quarter: str, start_date: datetime, end_date: datetime,
+                        all_branches: bool, analysis: Dict, save_index: bool = True) -> str:
+        """Write a quarterly snapshot file and return its path.
+        
+        With save_index=False the index entry is only recorded; the caller
+        saves the index once after writing a batch of snapshots.
+        """
+        commit_count = analysis['commit_metrics']['total_commits']
+        
         # Build snapshot
         snapshot = {
             'metadata': {
@@ -619,45 +2255,243 @@ class GitProductivityAnalyzer:
                 'all_branches': all_branches
             },
             'analysis': analysis,
-            'raw_commit_count': len(commits)
+            'raw_commit_count': commit_count
         }
+        if self.pathspecs:
+            snapshot['metadata']['pathspecs'] = self.pathspecs
         
-        # Save
+        # Save, and index it for reports
         snapshot_file = self.snapshots_dir / f"snapshot-{quarter}.json"
-        with open(snapshot_file, 'w', encoding='utf-8') as f:
-            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        with self._phase('write_snapshot', quarter=quarter) as info:
+            text, contributors_span = dump_snapshot(snapshot)
+            with open(snapshot_file, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(text)
+            self.snapshot_index.record(snapshot_file, snapshot, contributors_span)
+            if save_index:
+                self.snapshot_index.save()
+            info['bytes'] = len(text.encode('utf-8'))
         
         logger.info(f"✅ Snapshot saved: {snapshot_file}")
-        logger.info(f"   Commits: {len(commits)}, Contributors: {analysis['contributor_metrics']['total_contributors']}")
+        logger.info(f"   Commits: {commit_count}, Contributors: {analysis['contributor_metrics']['total_contributors']}")
         
         return str(snapshot_file)
     
-    def create_snapshots_since(self, since_date: str, all_branches: bool = True, include_quality: bool = False) -> List[str]:
+    def create_snapshots_since(self, since_date: str, all_branches: bool = True, include_quality: bool = False,
+                               raise_errors: bool = False) -> List[str]:
         """Create snapshots for all quarters since given date.
         
+        History is walked once: a single `git log` covers the whole range and
+        commits are bucketed into quarters by commit timestamp, using the same
+        windows `create_snapshot` passes to `--since/--until`.
+        
         Args:
             since_date: Start date (YYYY-MM-DD)
             all_branches: Include all branches or just current
             include_quality: Calculate Halstead/quality metrics (slower, requires radon)
+            raise_errors: Re-raise history and snapshot failures instead of logging them
         """
         quarters = self.generate_quarters_since(since_date)
         
         logger.info(f"Generating {len(quarters)} quarterly snapshots: {', '.join(quarters)}")
+        if include_quality and not RADON_AVAILABLE:
+            logger.warning("Quality metrics requested but radon not available. Install with: pip install radon")
+            include_quality = False
         if include_quality:
             logger.info("Quality metrics enabled (slower but includes MI, Halstead, CC)")
         
+        if not quarters:
+            return []
+        
+        windows = {quarter: self.get_quarter_dates(quarter) for quarter in quarters}
+        bounds = {quarter: (start.timestamp(), end.timestamp()) for quarter, (start, end) in windows.items()}
+        columns = {quarter: self._new_columns() for quarter in quarters}
+        
+        range_start = windows[quarters[0]][0]
+        range_end = windows[quarters[-1]][1]
+        try:
+            with self._phase('read_commits') as info:
+                for commit in self.iter_commits_in_range(range_start, range_end, all_branches):
+                    timestamp = commit['committer_timestamp']
+                    quarter = self._quarter_of_timestamp(timestamp)
+                    if quarter not in columns:
+                        continue
+                    start_ts, end_ts = bounds[quarter]
+                    if start_ts <= timestamp <= end_ts:
+                        columns[quarter].add(commit)
+                info['commits'] = sum(quarter_columns.total_commits for quarter_columns in columns.values())
+        except Exception as e:
+            logger.error(f"Failed to read commit history since {since_date}: {e}")
+            if raise_errors:
+                raise
+            return []
+        
         snapshot_files = []
-        for quarter in quarters:
-            try:
-                snapshot_file = self.create_snapshot(quarter, all_branches, include_quality)
-                snapshot_files.append(snapshot_file)
-            except Exception as e:
-                logger.error(f"Failed to create snapshot for {quarter}: {e}")
+        try:
+            for quarter in quarters:
+                try:
+                    logger.info(f"Creating snapshot for {quarter}...")
+                    analysis = self._analysis_from_columns(columns[quarter], include_quality)
+                    start_date, end_date = windows[quarter]
+                    snapshot_file = self._write_snapshot(quarter, start_date, end_date, all_branches, analysis,
+                                                         save_index=False)
+                    snapshot_files.append(snapshot_file)
+                except Exception as e:
+                    logger.error(f"Failed to create snapshot for {quarter}: {e}")
+                    if raise_errors:
+                        raise
+        finally:
+            self.snapshot_index.save()
         
         return snapshot_files
     
+    @staticmethod
+    def _quarter_of_timestamp(timestamp: int) -> str:
+        """Return the 'YYYY-QN' quarter containing a Unix timestamp (local time)."""
+        moment = datetime.fromtimestamp(timestamp)
+        return f"{moment.year}-Q{(moment.month - 1) // 3 + 1}"
+    
+    @staticmethod
+    def _bucket_start(moment: datetime, bucket: str) -> date:
+        """First day of the day/week/month/quarter bucket containing a local time."""
+        day = moment.date()
+        if bucket == 'day':
+            return day
+        if bucket == 'week':
+            return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+        if bucket == 'month':
+            return day.replace(day=1)
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    
+    @staticmethod
+    def _next_bucket(start: date, bucket: str) -> date:
+        if bucket == 'day':
+            return start + timedelta(days=1)
+        if bucket == 'week':
+            return start + timedelta(days=7)
+        months = 1 if bucket == 'month' else 3
+        month = start.month - 1 + months
+        return date(start.year + month // 12, month % 12 + 1, 1)
+    
+    def create_timeseries(self, since_date: str, bucket: str = 'week', rolling: Optional[int] = None,
+                          all_branches: bool = True, until_date: Optional[str] = None) -> str:
+        """Write headline metrics per day/week/month/quarter bucket to one file.
+        
+        A single commit stream is split into per-bucket CommitColumns by
+        commit timestamp (local time), so every bucket is computed exactly as
+        a snapshot over the same commits would be. With `rolling`, metrics are
+        also computed over each window of that many consecutive buckets
+        (null until the first full window). The output is columnar: one list
+        of bucket start dates and one list per metric.
+        
+        Args:
+            since_date: Start date (YYYY-MM-DD)
+            bucket: One of TIMESERIES_BUCKETS
+            rolling: Rolling window length in buckets (optional)
+            all_branches: Include all branches or just current
+            until_date: End date (YYYY-MM-DD, default: now)
+        """
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValueError(f"Invalid bucket: {bucket}. Use one of {', '.join(TIMESERIES_BUCKETS)}")
+        if rolling is not None and rolling < 1:
+            raise ValueError(f"Rolling window must be at least 1 bucket, got {rolling}")
+        
+        range_start = datetime.strptime(since_date, '%Y-%m-%d')
+        range_end = datetime.strptime(until_date, '%Y-%m-%d') + timedelta(days=1) if until_date else datetime.now()
+        
+        starts = []
+        current = self._bucket_start(range_start, bucket)
+        while current < range_end.date() or not starts:
+            starts.append(current)
+            current = self._next_bucket(current, bucket)
+        index = {start: i for i, start in enumerate(starts)}
+        columns = [self._new_columns() for _ in starts]
+        
+        logger.info(f"Building {bucket} time series ({len(starts)} buckets) since {since_date}...")
+        with self._phase('read_commits') as info:
+            for commit in self.iter_commits_in_range(range_start, range_end, all_branches):
+                i = index.get(self._bucket_start(datetime.fromtimestamp(commit['committer_timestamp']), bucket))
+                if i is not None:
+                    columns[i].add(commit)
+            info['commits'] = sum(bucket_columns.total_commits for bucket_columns in columns)
+        
+        def metrics_of(bucket_columns: CommitColumns) -> Dict:
+            if not bucket_columns.total_commits:
+                return headline_metrics(self._empty_analysis())
+            return headline_metrics(bucket_columns.to_analysis())
+        
+        def to_series(rows: List[Optional[Dict]]) -> Dict[str, List]:
+            return {field: [row[field] if row else None for row in rows] for field in TIMESERIES_FIELDS}
+        
+        timeseries = {
+            'metadata': {
+                'bucket': bucket,
+                'rolling_window': rolling,
+                'since': since_date,
+                'until': range_end.isoformat(),
+                'created': datetime.now().isoformat(),
+                'repository_path': str(self.repo_path),
+                'all_branches': all_branches
+            },
+            'buckets': [start.isoformat() for start in starts],
+            'series': to_series([metrics_of(bucket_columns) for bucket_columns in columns])
+        }
+        if self.pathspecs:
+            timeseries['metadata']['pathspecs'] = self.pathspecs
+        
+        if rolling:
+            windows = []
+            for i in range(len(columns)):
+                if i + 1 < rolling:
+                    windows.append(None)
+                    continue
+                window = self._new_columns()
+                for bucket_columns in columns[i + 1 - rolling:i + 1]:
+                    window.extend(bucket_columns)
+                windows.append(metrics_of(window))
+            timeseries['rolling'] = to_series(windows)
+        
+        output_file = self.snapshots_dir / f"timeseries-{bucket}.json"
+        with self._phase('write_timeseries', bucket=bucket):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(timeseries, f, ensure_ascii=False, separators=(',', ':'))
+        
+        logger.info(f"✅ Time series saved: {output_file}")
+        return str(output_file)
+    
+    def print_timeseries(self, bucket: str, last: int = 12):
+        """Print the most recent buckets of a time series file."""
+        file = self.snapshots_dir / f"timeseries-{bucket}.json"
+        if not file.exists():
+            print(f"❌ Time series not found: {bucket}")
+            return
+        
+        with open(file, 'r', encoding='utf-8') as f:
+            timeseries = json.load(f)
+        
+        series = timeseries['series']
+        rolling = timeseries.get('rolling')
+        window = timeseries['metadata'].get('rolling_window')
+        
+        print(f"\n{'='*90}")
+        print(f"📈 Git Productivity Time Series ({bucket}, last {min(last, len(timeseries['buckets']))} of {len(timeseries['buckets'])})")
+        print(f"{'='*90}")
+        header = f"{'Start':<12} {'Commits':<10} {'Contributors':<14} {'Total Churn':<14} {'Avg/Commit':<12} {'Rework':<8}"
+        if rolling:
+            header += f" {f'Commits ({window})':<14} {f'Contributors ({window})':<18}"
+        print(header)
+        print("-"*90)
+        for i in range(max(0, len(timeseries['buckets']) - last), len(timeseries['buckets'])):
+            line = (f"{timeseries['buckets'][i]:<12} {series['commits'][i]:<10} {series['contributors'][i]:<14} "
+                    f"{series['total_churn'][i]:<14,} {series['avg_churn_per_commit'][i]:<12.1f} {series['rework_ratio'][i]:<8.3f}")
+            if rolling:
+                commits = rolling['commits'][i]
+                contributors = rolling['contributors'][i]
+                line += f" {'-' if commits is None else commits:<14} {'-' if contributors is None else contributors:<18}"
+            print(line)
+        print(f"{'='*90}\n")
+    
     def compare_quarters(self, q1: str, q2: str) -> Dict:
-        """Compare two quarterly snapshots."""
+        """Compare two quarterly snapshots (headline metrics from the snapshot index)."""
         # Load snapshots
         file1 = self.snapshots_dir / f"snapshot-{q1}.json"
         file2 = self.snapshots_dir / f"snapshot-{q2}.json"
@@ -665,13 +2499,9 @@ class GitProductivityAnalyzer:
         if not file1.exists() or not file2.exists():
             raise FileNotFoundError(f"Missing snapshot files for {q1} or {q2}")
         
-        with open(file1, 'r') as f:
-            snap1 = json.load(f)
-        with open(file2, 'r') as f:
-            snap2 = json.load(f)
-        
-        a1 = snap1['analysis']
-        a2 = snap2['analysis']
+        a1 = self.snapshot_index.entry(file1)['analysis']
+        a2 = self.snapshot_index.entry(file2)['analysis']
+        self.snapshot_index.save()
         
         # Calculate deltas
         comparison = {
@@ -708,10 +2538,9 @@ class GitProductivityAnalyzer:
             print(f"❌ Snapshot not found: {quarter}")
             return
         
-        with open(file, 'r') as f:
-            snapshot = json.load(f)
-        
-        a = snapshot['analysis']
+        a = self.snapshot_index.entry(file)['analysis']
+        top_contributors = self.snapshot_index.contributors(file)[:5]
+        self.snapshot_index.save()
         
         print(f"\n{'='*70}")
         print(f"📊 Git Productivity Snapshot: {quarter}")
@@ -736,12 +2565,21 @@ class GitProductivityAnalyzer:
         print(f"   Large (200-1000): {a['commit_size_distribution']['large_commits_200_1000']}")
         print(f"   Huge (>1000): {a['commit_size_distribution']['huge_commits_over_1000']}")
         
+        if 'rename_metrics' in a:
+            r = a['rename_metrics']
+            print(f"\n🔀 RENAMES & BINARIES")
+            print(f"   Renamed Files: {r['renamed_files']}")
+            print(f"   Copied Files: {r['copied_files']}")
+            print(f"   Churn in Renamed/Copied Files: {r['rename_churn']:,} lines")
+            print(f"   Binary Files Changed: {r['binary_files']}")
+            print(f"   Binary Size Change: +{r['binary_bytes_added']:,} / -{r['binary_bytes_removed']:,} bytes")
+        
         print(f"\n👥 CONTRIBUTOR METRICS")
         print(f"   Total Contributors: {a['contributor_metrics']['total_contributors']}")
         print(f"   Churn/Contributor: {a['contributor_metrics']['churn_per_contributor']:.2f}")
         
         print(f"\n   Top 5 Contributors:")
-        for i, c in enumerate(a['contributor_metrics']['contributors'][:5], 1):
+        for i, c in enumerate(top_contributors, 1):
             print(f"      {i}. {c['name']} ({c['email']})")
             print(f"         Commits: {c['commit_count']} ({c['commit_percentage']:.1f}%)")
             print(f"         Churn: {c['total_churn']:,} lines (avg {c['avg_churn_per_commit']:.0f}/commit)")
@@ -749,10 +2587,17 @@ class GitProductivityAnalyzer:
         print(f"{'='*70}\n")
     
     def print_trend_report(self):
-        """Print comprehensive trend report across all snapshots."""
-        snapshot_files = sorted(self.snapshots_dir.glob('snapshot-*.json'))
+        """Print comprehensive trend report across all snapshots.
         
-        if not snapshot_files:
+        Everything comes from the snapshot index, including the per-contributor
+        totals behind the all-time contributor sections; snapshot files are
+        only read to refresh stale index entries.
+        """
+        with self._phase('load_snapshot_index') as info:
+            snapshot_entries = self.snapshot_index.all_entries()
+            info['snapshots'] = len(snapshot_entries)
+        
+        if not snapshot_entries:
             print("\n❌ No snapshots found. Generate snapshots first with 'snapshots' command.\n")
             return
         
@@ -773,14 +2618,13 @@ class GitProductivityAnalyzer:
         total_churn = 0
         all_contributors = set()
         
-        for snapshot_file in snapshot_files:
-            with open(snapshot_file, 'r') as f:
-                data = json.load(f)
-            
+        contributors_by_snapshot = []
+        for snapshot_file, data in snapshot_entries:
             quarter = data['metadata']['quarter']
             cm = data['analysis']['commit_metrics']
             chm = data['analysis']['churn_metrics']
             contrib = data['analysis']['contributor_metrics']
+            contributors = self.snapshot_index.contributor_totals(snapshot_file)
             
             # Print row
             print(f"{quarter:<12} {cm['total_commits']:<10} {contrib['total_contributors']:<15} "
@@ -790,10 +2634,13 @@ class GitProductivityAnalyzer:
             # Accumulate totals
             total_commits += cm['total_commits']
             total_churn += chm['total_churn']
-            for c in contrib['contributors']:
+            for c in contributors:
                 all_contributors.add(c['email'])
             
             all_data.append(data)
+            contributors_by_snapshot.append(contributors)
+        
+        self.snapshot_index.save()
         
         print("-"*110)
         
@@ -862,8 +2709,8 @@ class GitProductivityAnalyzer:
         
         # Top contributors across all time
         contributor_totals = defaultdict(lambda: {'name': '', 'commits': 0, 'churn': 0})
-        for data in all_data:
-            for c in data['analysis']['contributor_metrics']['contributors']:
+        for contributors in contributors_by_snapshot:
+            for c in contributors:
                 email = c['email']
                 contributor_totals[email]['name'] = c['name']
                 contributor_totals[email]['commits'] += c['commit_count']
@@ -944,6 +2791,178 @@ class GitProductivityAnalyzer:
         print("\n" + "="*110 + "\n")
 
 
+def _fleet_snapshot_repo(repo_path: str, snapshots_dir: str, since_date: str, all_branches: bool,
+                         include_quality: bool, analyzer_options: Dict) -> Dict:
+    """Fleet worker: generate one repository's snapshots, never raising.
+    
+    A repository without commits, or whose history cannot be read, is
+    reported as failed with git's error message. `snapshot_files` lists the
+    files written by this run, which are the only ones the rollup reads.
+    """
+    started = time.monotonic()
+    try:
+        analyzer = GitProductivityAnalyzer(repo_path, snapshots_dir=Path(snapshots_dir), **analyzer_options)
+        if not analyzer._run_git(['rev-list', '-n', '1', '--all' if all_branches else 'HEAD']):
+            raise ValueError("repository has no commits")
+        snapshot_files = analyzer.create_snapshots_since(since_date, all_branches, include_quality, raise_errors=True)
+        analyzer.write_profile('snapshots')
+        return {'status': 'ok', 'snapshots': len(snapshot_files), 'snapshot_files': snapshot_files, 'error': None,
+                'seconds': round(time.monotonic() - started, 2)}
+    except Exception as e:
+        if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+            error = f"git {' '.join(e.cmd[1:])}: {e.stderr.strip().splitlines()[0]}"
+        else:
+            error = f"{type(e).__name__}: {e}"
+        return {'status': 'failed', 'snapshots': 0, 'snapshot_files': [], 'error': error,
+                'seconds': round(time.monotonic() - started, 2)}
+
+
+class FleetAnalyzer:
+    """Snapshot generation over many repositories, plus an org-level rollup.
+    
+    Repositories are processed concurrently on a bounded process pool, each
+    writing to its own directory under `output_dir/repos`. A failing
+    repository is recorded and does not stop the others. The rollup merges
+    per-quarter snapshots across repositories, deduplicating contributors by
+    (lowercased) email.
+    """
+    
+    def __init__(self, repo_paths: List[str], output_dir: str, jobs: int = 1,
+                 analyzer_options: Optional[Dict] = None):
+        self.repo_paths = [str(Path(repo_path).resolve()) for repo_path in repo_paths]
+        self.output_dir = Path(output_dir).resolve()
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.analyzer_options = analyzer_options or {}
+        self.repo_dirs = self._assign_output_dirs()
+    
+    def _assign_output_dirs(self) -> Dict[str, Path]:
+        """One output directory per repository, named after it (suffixed on clashes)."""
+        repo_dirs = {}
+        used = set()
+        for repo_path in self.repo_paths:
+            name = Path(repo_path).name or 'repo'
+            candidate, n = name, 1
+            while candidate in used:
+                n += 1
+                candidate = f"{name}-{n}"
+            used.add(candidate)
+            repo_dirs[repo_path] = self.output_dir / 'repos' / candidate
+        return repo_dirs
+    
+    def run(self, since_date: str, all_branches: bool = True, include_quality: bool = False) -> Dict:
+        """Generate snapshots for every repository and write the rollup."""
+        started = time.monotonic()
+        results = {}
+        total = len(self.repo_paths)
+        logger.info(f"Fleet: {total} repositories, {self.jobs} at a time, output in {self.output_dir}")
+        
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {
+                executor.submit(_fleet_snapshot_repo, repo_path, str(self.repo_dirs[repo_path]), since_date,
+                                all_branches, include_quality, self.analyzer_options): repo_path
+                for repo_path in self.repo_paths
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                repo_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:  # e.g. the worker process died
+                    result = {'status': 'failed', 'snapshots': 0, 'snapshot_files': [],
+                              'error': f"{type(e).__name__}: {e}", 'seconds': None}
+                results[repo_path] = result
+                if result['status'] == 'ok':
+                    logger.info(f"[{done}/{total}] ✅ {repo_path}: {result['snapshots']} snapshots in {result['seconds']}s")
+                else:
+                    logger.error(f"[{done}/{total}] ❌ {repo_path}: {result['error']}")
+        
+        rollup = self.build_rollup(results, since_date, all_branches)
+        rollup['metadata']['elapsed_seconds'] = round(time.monotonic() - started, 2)
+        
+        rollup_file = self.output_dir / 'fleet-rollup.json'
+        with open(rollup_file, 'w', encoding='utf-8') as f:
+            json.dump(rollup, f, indent=2, ensure_ascii=False)
+        logger.info(f"✅ Fleet rollup saved: {rollup_file}")
+        rollup['metadata']['rollup_file'] = str(rollup_file)
+        return rollup
+    
+    def build_rollup(self, results: Dict[str, Dict], since_date: str, all_branches: bool) -> Dict:
+        """Merge the per-repository quarterly snapshots into org-level totals.
+        
+        Only the snapshot files each repository's run reported are merged, so
+        files left in a reused output directory by earlier runs (e.g. with an
+        older --since) do not leak into the totals.
+        """
+        quarters: Dict[str, Dict] = {}
+        for repo_path in self.repo_paths:
+            result = results.get(repo_path, {})
+            if result.get('status') != 'ok':
+                continue
+            index = SnapshotIndex(self.repo_dirs[repo_path])
+            for snapshot_file in map(Path, result.get('snapshot_files', [])):
+                entry = index.entry(snapshot_file)
+                quarter = entry['metadata']['quarter']
+                cm = entry['analysis']['commit_metrics']
+                chm = entry['analysis']['churn_metrics']
+                totals = quarters.setdefault(quarter, {
+                    'repositories': 0, 'active_repositories': 0, 'total_commits': 0,
+                    'total_additions': 0, 'total_deletions': 0, 'total_churn': 0, 'contributors': {}
+                })
+                totals['repositories'] += 1
+                totals['active_repositories'] += 1 if cm['total_commits'] else 0
+                totals['total_commits'] += cm['total_commits']
+                totals['total_additions'] += chm['total_additions']
+                totals['total_deletions'] += chm['total_deletions']
+                totals['total_churn'] += chm['total_churn']
+                for c in index.contributor_totals(snapshot_file):
+                    merged = totals['contributors'].setdefault(c['email'].lower(), {
+                        'email': c['email'].lower(), 'name': c['name'], 'commit_count': 0,
+                        'additions': 0, 'deletions': 0, 'total_churn': 0, 'repositories': set()
+                    })
+                    merged['commit_count'] += c['commit_count']
+                    merged['additions'] += c['additions']
+                    merged['deletions'] += c['deletions']
+                    merged['total_churn'] += c['total_churn']
+                    merged['repositories'].add(repo_path)
+            index.save()
+        
+        for quarter, totals in quarters.items():
+            contributors = sorted(totals['contributors'].values(), key=lambda c: c['commit_count'], reverse=True)
+            for c in contributors:
+                c['repositories'] = len(c['repositories'])
+            totals['total_contributors'] = len(contributors)
+            totals['avg_churn_per_commit'] = round(totals['total_churn'] / totals['total_commits'], 2) if totals['total_commits'] else 0
+            totals['contributors'] = contributors
+        
+        return {
+            'metadata': {
+                'since': since_date,
+                'all_branches': all_branches,
+                'created': datetime.now().isoformat(),
+                'output_dir': str(self.output_dir),
+                'repositories': len(self.repo_paths),
+                'succeeded': sum(1 for r in results.values() if r['status'] == 'ok'),
+                'failed': sum(1 for r in results.values() if r['status'] != 'ok')
+            },
+            'repositories': [
+                dict(results.get(repo_path, {'status': 'skipped'}), path=repo_path,
+                     snapshots_dir=str(self.repo_dirs[repo_path]))
+                for repo_path in self.repo_paths
+            ],
+            'quarters': {quarter: quarters[quarter] for quarter in sorted(quarters)}
+        }
+
+
+def read_repo_list(path: str) -> List[str]:
+    """Repository paths from a file: one per line, '#' starts a comment."""
+    repos = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                repos.append(line)
+    return repos
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Git Productivity Analyzer - Quarterly snapshots from Git history',
@@ -956,6 +2975,39 @@ Examples:
   # Generate single quarter
   python git_productivity_analyzer.py snapshot --quarter 2024-Q4
   
+  # Quality snapshots on 8 cores
+  python git_productivity_analyzer.py --workers 8 snapshots --since 2024-01-01 --with-quality
+  
+  # Nightly refresh: only commits added since the last run are read from git
+  python git_productivity_analyzer.py --commit-cache snapshot --quarter 2024-Q4
+  
+  # Reuse per-file quality metrics for blobs seen before (~/.cache/olaf)
+  python git_productivity_analyzer.py --quality-cache snapshots --since 2024-01-01 --with-quality
+  
+  # Every source file, but at most 10 minutes per snapshot on all cores
+  python git_productivity_analyzer.py --workers 0 --time-budget 600 snapshots --since 2024-01-01 --with-quality
+  
+  # Every source file, re-analyzing only files changed since the previous snapshot
+  python git_productivity_analyzer.py --incremental-quality snapshots --since 2024-01-01 --with-quality
+  
+  # Weekly time series with 4-week rolling windows, one file
+  python git_productivity_analyzer.py timeseries --since 2024-01-01 --bucket week --rolling 4
+  
+  # Snapshots for every repository listed in repos.txt, 8 at a time, plus an org rollup
+  python git_productivity_analyzer.py --commit-cache fleet --repos repos.txt --jobs 8 --since 2024-01-01
+  
+  # Count renames/copies as moves rather than delete+add; track binary size changes
+  python git_productivity_analyzer.py --rename-aware snapshots --since 2024-01-01
+  
+  # Leave vendored, generated and lockfile paths out of every metric (filtered inside git)
+  python git_productivity_analyzer.py --path-profile vendored snapshots --since 2024-01-01
+  
+  # Where does the time go? Per-phase trace (open in chrome://tracing or Perfetto)
+  python git_productivity_analyzer.py --profile snapshots --since 2024-01-01 --with-quality
+  
+  # Merge author aliases via .mailmap and an alias file
+  python git_productivity_analyzer.py --aliases aliases.json snapshots --since 2024-01-01
+  
   # Compare two quarters
   python git_productivity_analyzer.py compare 2024-Q1 2024-Q4
   
@@ -966,6 +3018,40 @@ Examples:
     
     parser.add_argument('--repo-path', default='.', help='Path to Git repository (default: current dir)')
     parser.add_argument('--current-branch-only', action='store_true', help='Only analyze current branch (default: all branches)')
+    parser.add_argument('--commit-cache', action='store_true',
+                        help='Reuse parsed commits from olaf-data/git-snapshots/commit-cache.sqlite; only new commits are read from git')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for quality metric evaluation (default: 1, serial; 0: one per CPU)')
+    parser.add_argument('--quality-cache', action='store_true',
+                        help=f'Cache per-file quality metrics by git blob id in {default_quality_cache_path()}')
+    parser.add_argument('--quality-cache-path', metavar='PATH',
+                        help='Quality cache database to use instead of the default one (implies --quality-cache)')
+    parser.add_argument('--incremental-quality', action='store_true',
+                        help='Analyze all source files (no 1000-file sample), re-analyzing only files changed since the previous quality snapshot')
+    parser.add_argument('--full-coverage', action='store_true',
+                        help='Analyze all source files (no 1000-file sample), in blob id order, within --time-budget/--max-bytes')
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS',
+                        help='Stop full-coverage quality analysis after this many seconds per snapshot (implies --full-coverage)')
+    parser.add_argument('--max-bytes', type=int, default=None,
+                        help='Stop full-coverage quality analysis after reading this many blob bytes per snapshot (implies --full-coverage)')
+    parser.add_argument('--resolve-identities', action='store_true',
+                        help='Group contributors by canonical identity from .mailmap (and --aliases)')
+    parser.add_argument('--aliases', metavar='FILE', default=None,
+                        help='JSON alias file mapping emails/names to canonical identities (implies --resolve-identities)')
+    parser.add_argument('--rename-aware', action='store_true',
+                        help='Detect renames and copies (git log -M -C) and track binary size changes in a rename_metrics section')
+    parser.add_argument('--path-profile', metavar='FILE', default=None,
+                        help="JSON include/exclude globs applied as git pathspecs, or 'vendored' for the built-in "
+                             "dependency/build/lockfile/linguist-generated exclusions")
+    parser.add_argument('--radon-metrics', action='store_true',
+                        help='With --with-quality, add radon Halstead/MI/CC averages over every Python file (one parse per file)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write a Chrome trace (trace-<time>-<command>.json, next to the snapshots) with per-phase '
+                             'wall/CPU time, git processes and bytes, and peak RSS')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='Also dump cProfile stats per phase to cprofile-<time>/ (implies --profile)')
+    parser.add_argument('--quality-cache-max-entries', type=int, default=QUALITY_CACHE_MAX_ENTRIES,
+                        help=f'Evict least recently used quality cache entries beyond this count (default: {QUALITY_CACHE_MAX_ENTRIES})')
     
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
@@ -988,6 +3074,24 @@ Examples:
     show_parser = subparsers.add_parser('show', help='Show snapshot summary')
     show_parser.add_argument('quarter', help='Quarter to show (YYYY-QN)')
     
+    # Timeseries command (arbitrary buckets and rolling windows, one file)
+    timeseries_parser = subparsers.add_parser('timeseries', help='Write day/week/month/quarter metrics since date to one time series file')
+    timeseries_parser.add_argument('--since', default='2024-01-01', help='Start date (YYYY-MM-DD, default: 2024-01-01)')
+    timeseries_parser.add_argument('--until', default=None, help='End date, inclusive (YYYY-MM-DD, default: now)')
+    timeseries_parser.add_argument('--bucket', choices=TIMESERIES_BUCKETS, default='week', help='Bucket size (default: week)')
+    timeseries_parser.add_argument('--rolling', type=int, default=None, metavar='N',
+                                   help='Also compute metrics over rolling windows of N buckets')
+    
+    # Fleet command (many repositories, org-level rollup)
+    fleet_parser = subparsers.add_parser('fleet', help='Generate snapshots for many repositories concurrently, plus an org-level rollup')
+    fleet_parser.add_argument('repos', nargs='*', help='Repository paths')
+    fleet_parser.add_argument('--repos', dest='repos_file', help='File listing repository paths, one per line')
+    fleet_parser.add_argument('--since', default='2024-01-01', help='Start date (YYYY-MM-DD, default: 2024-01-01)')
+    fleet_parser.add_argument('--with-quality', action='store_true', help='Include Halstead/MI/CC metrics (slower, requires radon)')
+    fleet_parser.add_argument('--jobs', type=int, default=4, help='Repositories processed concurrently (default: 4; 0: one per CPU)')
+    fleet_parser.add_argument('--output-dir', default='olaf-data/fleet',
+                              help='Per-repo snapshots go to OUTPUT_DIR/repos/<name>, the rollup to OUTPUT_DIR/fleet-rollup.json (default: olaf-data/fleet)')
+    
     # Report command (trend report across all snapshots)
     report_parser = subparsers.add_parser('report', help='Generate comprehensive trend report across all snapshots')
     
@@ -996,10 +3100,50 @@ Examples:
     if not args.command:
         parser.print_help()
         sys.exit(1)
+    if args.incremental_quality and (args.full_coverage or args.time_budget or args.max_bytes):
+        parser.error('--incremental-quality cannot be combined with --full-coverage, --time-budget or --max-bytes')
+    path_profile = None
+    if args.path_profile:
+        try:
+            path_profile = PathProfile.load(args.path_profile)
+        except (OSError, ValueError) as e:
+            parser.error(f"--path-profile {args.path_profile}: {e}")
+    
+    analyzer_options = {
+        'use_commit_cache': args.commit_cache,
+        'workers': args.workers,
+        'quality_cache': args.quality_cache_path or (default_quality_cache_path() if args.quality_cache else None),
+        'quality_cache_max_entries': args.quality_cache_max_entries,
+        'incremental_quality': args.incremental_quality,
+        'full_coverage': args.full_coverage,
+        'time_budget': args.time_budget,
+        'max_bytes': args.max_bytes,
+        'resolve_identities': args.resolve_identities,
+        'alias_file': str(Path(args.aliases).resolve()) if args.aliases else None,
+        'rename_aware': args.rename_aware,
+        'path_profile': path_profile,
+        'profile': args.profile,
+        'cprofile': args.cprofile,
+        'radon_metrics': args.radon_metrics
+    }
+    all_branches = not args.current_branch_only
     
     try:
-        analyzer = GitProductivityAnalyzer(args.repo_path)
-        all_branches = not args.current_branch_only
+        if args.command == 'fleet':
+            repos = list(args.repos) + (read_repo_list(args.repos_file) if args.repos_file else [])
+            if not repos:
+                fleet_parser.error('no repositories given (paths or --repos FILE)')
+            fleet = FleetAnalyzer(repos, args.output_dir, args.jobs, analyzer_options)
+            rollup = fleet.run(args.since, all_branches, args.with_quality)
+            meta = rollup['metadata']
+            print(f"\n✅ Fleet done: {meta['succeeded']}/{meta['repositories']} repositories in {meta['elapsed_seconds']}s")
+            for repo in rollup['repositories']:
+                if repo['status'] != 'ok':
+                    print(f"   ❌ {repo['path']}: {repo.get('error')}")
+            print(f"   Rollup: {meta['rollup_file']}")
+            return
+        
+        analyzer = GitProductivityAnalyzer(args.repo_path, **analyzer_options)
         
         if args.command == 'snapshots':
             include_quality = getattr(args, 'with_quality', False)
@@ -1043,8 +3187,17 @@ Examples:
         elif args.command == 'show':
             analyzer.print_snapshot_summary(args.quarter)
         
+        elif args.command == 'timeseries':
+            timeseries_file = analyzer.create_timeseries(args.since, args.bucket, args.rolling, all_branches, args.until)
+            analyzer.print_timeseries(args.bucket)
+            print(f"✅ Time series written to {timeseries_file}")
+        
         elif args.command == 'report':
             analyzer.print_trend_report()
+        
+        trace_file = analyzer.write_profile(args.command)
+        if trace_file:
+            print(f"⏱️  Profile trace: {trace_file}")
     
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Author Identity Resolution - .mailmap and alias file support
+
+Maps the raw author name/email recorded in commits to one canonical
+identity per person, so that analyzers group "Jane Doe <jane@old.com>",
+"jdoe <JANE@corp.com>" and "Jane D. <jane@corp.com>" together.
+
+Sources, applied in order:
+- The mailmap sources git itself reads, in git's order: the work tree's
+  .mailmap, the `mailmap.blob` object (defaulting to HEAD:.mailmap in a
+  bare repository) and the `mailmap.file` path from git config, with git's
+  matching rules, i.e. what `%aN`/`%aE` would print
+- An optional alias file (JSON):
+    
+    {
+      "identities": [
+        {"name": "Jane Doe", "email": "jane@corp.com",
+         "aliases": ["jane@old.com", "jdoe", "Jane D."]}
+      ]
+    }
+  
+  Aliases containing '@' match emails, others match names (case-insensitive).
+
+Resolution works on raw `%an`/`%ae` values, so cached commit records stay
+valid when the mailmap changes. Every distinct (name, email) pair is
+resolved once per run.
+
+skills/analyze-contributor-risk/tools/contributor_analyzer.py imports this
+module from here as well.
+"""
+
+import json
+import subprocess
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Identity(NamedTuple):
+    """A canonical author: `id` is the lowercased canonical email (or name)."""
+    id: str
+    name: str
+    email: str
+
+
+class IdentityResolver:
+    """Resolve raw commit authors to canonical identities."""
+    
+    def __init__(self, repo_path: str = ".", alias_file: Optional[str] = None, use_mailmap: bool = True):
+        self.repo_path = Path(repo_path).resolve()
+        # (lowercased email, lowercased name or None) -> (proper name or None, proper email or None)
+        self.mailmap: Dict[Tuple[str, Optional[str]], Tuple[Optional[str], Optional[str]]] = {}
+        # lowercased email / name -> (canonical name, canonical email)
+        self.alias_emails: Dict[str, Tuple[str, str]] = {}
+        self.alias_names: Dict[str, Tuple[str, str]] = {}
+        self._resolved: Dict[Tuple[str, str], Identity] = {}
+        
+        if use_mailmap:
+            for source, text in self._mailmap_sources():
+                self.load_mailmap_text(text, source)
+        if alias_file:
+            self.load_aliases(alias_file)
+    
+    def _git(self, args) -> Optional[str]:
+        """Output of a git command, or None if it fails."""
+        try:
+            result = subprocess.run(['git'] + args, cwd=self.repo_path,
+                                    capture_output=True, text=True, encoding='utf-8', errors='replace')
+        except OSError:
+            return None
+        return result.stdout if result.returncode == 0 else None
+    
+    def _mailmap_sources(self) -> List[Tuple[str, str]]:
+        """(source, text) of every mailmap git would read, later ones taking precedence."""
+        sources = []
+        mailmap_file = self.repo_path / '.mailmap'
+        if mailmap_file.is_file():
+            sources.append((str(mailmap_file), mailmap_file.read_text(encoding='utf-8', errors='replace')))
+        
+        blob = (self._git(['config', 'mailmap.blob']) or '').strip()
+        if not blob and (self._git(['rev-parse', '--is-bare-repository']) or '').strip() == 'true':
+            blob = 'HEAD:.mailmap'
+        if blob:
+            text = self._git(['cat-file', 'blob', blob])
+            if text is not None:
+                sources.append((f"mailmap.blob {blob}", text))
+        
+        path = (self._git(['config', '--path', 'mailmap.file']) or '').strip()
+        if path:
+            mailmap_file = self.repo_path / Path(path).expanduser()
+            if mailmap_file.is_file():
+                sources.append((str(mailmap_file), mailmap_file.read_text(encoding='utf-8', errors='replace')))
+        return sources
+    
+    def load_mailmap(self, path: Path):
+        """Add entries from a .mailmap file."""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            self.load_mailmap_text(f.read(), str(path))
+    
+    def load_mailmap_text(self, text: str, source: str = '<mailmap>'):
+        """Add entries from mailmap text.
+        
+        Supported forms (as in git):
+            Proper Name <commit@email>
+            <proper@email> <commit@email>
+            Proper Name <proper@email> <commit@email>
+            Proper Name <proper@email> Commit Name <commit@email>
+        """
+        for line in text.splitlines():
+            if line.startswith('#'):
+                continue
+            first = self._parse_name_email(line)
+            if first is None:
+                continue
+            name1, email1, rest = first
+            second = self._parse_name_email(rest)
+            if second is None:
+                # Only the name is replaced, for any commit name
+                self._add_mapping(email1.lower(), None, name1 or None, None)
+            else:
+                name2, email2, _ = second
+                self._add_mapping(email2.lower(), name2.lower() or None, name1 or None, email1)
+        logger.debug(f"Loaded mailmap {source}: {len(self.mailmap)} entries")
+    
+    def _add_mapping(self, email: str, name: Optional[str], proper_name: Optional[str], proper_email: Optional[str]):
+        """Record one mailmap line the way git's add_mapping does.
+        
+        Lines for any commit name are merged: a line that sets only the name
+        or only the email keeps what earlier lines set for the other. Lines
+        for a specific commit name replace the previous mapping of that name.
+        """
+        if name is None and (email, None) in self.mailmap:
+            old_name, old_email = self.mailmap[(email, None)]
+            proper_name, proper_email = proper_name or old_name, proper_email or old_email
+        self.mailmap[(email, name)] = (proper_name, proper_email)
+    
+    @staticmethod
+    def _parse_name_email(text: str) -> Optional[Tuple[str, str, str]]:
+        """Split 'Name <email> rest' into (name, email, rest)."""
+        start = text.find('<')
+        end = text.find('>', start + 1)
+        if start < 0 or end < 0:
+            return None
+        return text[:start].strip(), text[start + 1:end].strip(), text[end + 1:]
+    
+    def load_aliases(self, alias_file: str):
+        """Add identities from a JSON alias file (see module docstring)."""
+        with open(alias_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for entry in data.get('identities', []):
+            canonical = (entry['name'], entry['email'])
+            self.alias_emails[entry['email'].lower()] = canonical
+            for alias in entry.get('aliases', []):
+                if '@' in alias:
+                    self.alias_emails[alias.lower()] = canonical
+                else:
+                    self.alias_names[alias.lower()] = canonical
+        logger.debug(f"Loaded {len(data.get('identities', []))} identities from {alias_file}")
+    
+    def apply_mailmap(self, name: str, email: str) -> Tuple[str, str]:
+        """What git prints as %aN/%aE for a raw %an/%ae."""
+        mapped = self.mailmap.get((email.lower(), name.lower())) or self.mailmap.get((email.lower(), None))
+        if mapped is None:
+            return name, email
+        proper_name, proper_email = mapped
+        return proper_name or name, proper_email or email
+    
+    def resolve(self, name: str, email: str) -> Identity:
+        """Canonical identity of a raw commit author."""
+        key = (name, email)
+        identity = self._resolved.get(key)
+        if identity is None:
+            mapped_name, mapped_email = self.apply_mailmap(name, email)
+            canonical = self.alias_emails.get(mapped_email.lower()) or self.alias_names.get(mapped_name.lower())
+            if canonical:
+                mapped_name, mapped_email = canonical
+            identity_id = mapped_email.lower() if mapped_email else f"name:{mapped_name.lower()}"
+            identity = self._resolved[key] = Identity(identity_id, mapped_name, mapped_email)
+        return identity